@@ -14,6 +14,7 @@ using :py:func:`config_context`. Example:
 """
 import collections
 from contextlib import contextmanager
+from functools import lru_cache
 import numpy as np
 
 from mot.lib.load_balancers import EvenDistribution, FractionalLoad
@@ -31,7 +32,7 @@ For any of the AbstractCLRoutines it holds that if no suitable defaults are give
 module. This entire module acts as a singleton containing the current runtime configuration.
 """
 _config = {
-    'cl_environments': CLEnvironmentFactory.smart_device_selection(preferred_device_type='GPU'),
+    'cl_environments': None,  # lazily set to the default devices, see get_cl_environments()
     'compile_flags': ['-cl-denorms-are-zero', '-cl-mad-enable', '-cl-no-signed-zeros'],
     'double_precision': False,
     'load_balancer': EvenDistribution()
@@ -41,9 +42,14 @@ _config = {
 def get_cl_environments():
     """Get the current CL environment to use during CL calculations.
 
+    If no environments were set, this selects the default devices on first use. Since that queries all the OpenCL
+    platforms and devices, we postpone it until the environments are actually needed instead of doing it at import.
+
     Returns:
         list of CLEnvironment: the current list of CL environments.
     """
+    if _config['cl_environments'] is None:
+        return _get_default_cl_environments()
     return _config['cl_environments']
 
 
@@ -63,14 +69,7 @@ def set_cl_environments(cl_environments):
     if not isinstance(cl_environments, collections.abc.Iterable):
         cl_environments = [cl_environments]
 
-    final_environments = []
-    all_environments = CLEnvironmentFactory.smart_device_selection()
-
-    for environment in cl_environments:
-        if isinstance(environment, int):
-            final_environments.append(all_environments[environment])
-        else:
-            final_environments.append(environment)
+    final_environments = _resolve_environment_indices(cl_environments)
 
     if not final_environments:
         raise ValueError('The list of CL Environments is empty.')
@@ -222,6 +221,37 @@ class CLRuntimeAction(SimpleConfigAction):
         set_load_balancer(self._cl_runtime_info.load_balancer)
 
 
+@lru_cache(maxsize=1)
+def _get_default_cl_environments():
+    """Get the default CL environments, selected once and reused afterwards.
+
+    Returns:
+        List[CLEnvironment]: the default list of CL environments
+    """
+    return CLEnvironmentFactory.smart_device_selection(preferred_device_type='GPU')
+
+
+def _resolve_environment_indices(cl_environments):
+    """Replace the integers in the given list of environments by the devices they index.
+
+    The integers index the devices returned by :func:`CLEnvironmentFactory.smart_device_selection`. Since that
+    queries the devices, we only call it if there are integers to resolve.
+
+    Args:
+        cl_environments (Iterable[Union[CLEnvironment, int]]): the environments and device indices
+
+    Returns:
+        List[CLEnvironment]: the list of CL environments
+    """
+    cl_environments = list(cl_environments)
+    if not any(isinstance(environment, int) for environment in cl_environments):
+        return cl_environments
+
+    all_environments = CLEnvironmentFactory.smart_device_selection()
+    return [all_environments[environment] if isinstance(environment, int) else environment
+            for environment in cl_environments]
+
+
 class RuntimeConfigurationAction(SimpleConfigAction):
 
     def __init__(self, cl_environments=None, compile_flags=None, double_precision=None, load_balancer=None):
@@ -295,23 +325,14 @@ class CLRuntimeInfo:
         if not isinstance(environments, collections.abc.Iterable):
             environments = [environments]
 
-        final_environments = []
-        all_environments = CLEnvironmentFactory.smart_device_selection()
-
-        for environment in environments:
-            if isinstance(environment, int):
-                final_environments.append(all_environments[environment])
-            else:
-                final_environments.append(environment)
-
-        return final_environments
+        return _resolve_environment_indices(environments)
 
     @staticmethod
     def _prepare_load_balancer(load_balancer):
         """Load the load balancer from a polymorphic datatype."""
         if load_balancer is None:
             return get_load_balancer()
-        if isinstance(load_balancer, collections.Iterable):
+        if isinstance(load_balancer, collections.abc.Iterable):
             return FractionalLoad(load_balancer)
         return load_balancer or EvenDistribution()
 
@@ -1,4 +1,6 @@
+from functools import lru_cache
 import pyopencl as cl
+from pyopencl.tools import ImmediateAllocator, MemoryPool
 from mot.lib.utils import device_supports_double, device_type_from_string
 
 __author__ = 'Robbert Harms'
@@ -22,6 +24,7 @@ class CLEnvironment:
         self._context = context
         self._device = device
         self._queue = cl.CommandQueue(self._context, device=device)
+        self._memory_pool = None
 
     @property
     def context(self):
@@ -41,6 +44,20 @@ class CLEnvironment:
         """
         return self._queue
 
+    @property
+    def memory_pool(self):
+        """Get a memory pool for allocating device buffers in this environment.
+
+        Allocating buffers from this pool reuses the device memory of previously released buffers, saving the
+        cost of repeated allocations of equally sized buffers.
+
+        Returns:
+            pyopencl.tools.MemoryPool: a memory pool allocating read-write buffers in this context
+        """
+        if self._memory_pool is None:
+            self._memory_pool = MemoryPool(ImmediateAllocator(self._queue))
+        return self._memory_pool
+
     @property
     def supports_double(self):
         """Check if the device listed by this environment supports double
@@ -50,6 +67,21 @@ class CLEnvironment:
         """
         return device_supports_double(self.device)
 
+    @property
+    def has_unified_memory(self):
+        """Check if the device in this environment shares its memory with the host.
+
+        This is the case for most CPU devices and for integrated GPU's. On these devices, buffers allocated with
+        ``USE_HOST_PTR`` can be used without any copy, making map/unmap the cheapest way of transferring data.
+
+        Returns:
+            boolean: True if the device and the host share a unified memory subsystem, false otherwise.
+        """
+        try:
+            return bool(self._device.host_unified_memory)
+        except cl.Error:
+            return False
+
     @property
     def platform(self):
         """Get the platform associated with this environment.
@@ -148,10 +180,12 @@ class CLEnvironment:
         return hash(self._platform) + hash(self._context) + hash(self._device) + hash(self._queue)
 
 
-def _initialize_cl_environment_cache():
-    """Initialize a cache of CL environments.
+@lru_cache(maxsize=1)
+def _get_cl_environment_cache():
+    """Get the cache of CL environments.
 
-    This cache holds, per platform a cache with all applicable CL environments.
+    This cache holds, per platform a cache with all applicable CL environments. Since building this queries all the
+    platforms and creates a context per platform, it is built on first use instead of at import.
 
     Returns:
         dict: a dictionary mapping platforms to CLEnvironment
@@ -177,9 +211,6 @@ def _initialize_cl_environment_cache():
     return cache
 
 
-_cl_environment_cache = _initialize_cl_environment_cache()
-
-
 class CLEnvironmentFactory:
 
     @staticmethod
@@ -229,12 +260,12 @@ class CLEnvironmentFactory:
         cl_environments = []
 
         if platform is None:
-            platforms = _cl_environment_cache.keys()
+            platforms = _get_cl_environment_cache().keys()
         else:
             platforms = [platform]
 
         for platform in platforms:
-            cached_envs = _cl_environment_cache[platform]
+            cached_envs = _get_cl_environment_cache()[platform]
 
             if cl_device_type:
                 for env in cached_envs:
@@ -1,12 +1,17 @@
-from collections.abc import Iterable
+import hashlib
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Future
 from copy import copy
-import tatsu
 from textwrap import dedent, indent
+import numpy as np
 import pyopencl as cl
 from mot.configuration import CLRuntimeInfo
 from mot.lib.cl_processors import MultiDeviceProcessor
-from mot.lib.kernel_data import Zeros
-from mot.lib.utils import split_cl_function, convert_inputs_to_kernel_data, get_cl_utility_definitions
+from mot.lib.kernel_data import Array, KernelData, Zeros
+from mot.lib.utils import split_cl_function, convert_inputs_to_kernel_data, get_cl_utility_definitions, \
+    is_scalar
 
 __author__ = 'Robbert Harms'
 __date__ = '2017-08-31'
@@ -15,9 +20,48 @@ __email__ = 'robbert@xkls.nl'
 __licence__ = 'LGPL v3'
 
 
+_compilation_cache = OrderedDict()
+"""Process wide cache of the compiled CL programs.
+
+This is keyed by the digest of the kernel source, the CL context and the compile flags, such that repeated evaluations
+of the same kernel (for example from newly constructed but identical CL functions) do not trigger a recompilation.
+Only the programs are cached, every evaluation creates its own kernel objects from them. Since the kernel arguments are
+set on the kernel object, sharing kernels between evaluations would not be thread safe. The cache is bounded, the least recently used programs are removed first.
+"""
+
+_compilation_cache_size = 128
+"""The maximum number of compiled programs kept in the compilation cache."""
+
+# the templates of the generated CL code, dedented once at import instead of on every code generation
+_cl_function_template = dedent('''
+    {kernel} {return_type} {cl_function_name}({parameters}){{
+    {body}
+    }}
+''')
+
+_include_guard_template = dedent('''
+    #ifndef {inclusion_guard_name}
+    #define {inclusion_guard_name}
+    {code}
+    #endif // {inclusion_guard_name}
+''')
+
+_kernel_wrapper_template = dedent('''
+    ulong gid = (ulong)(get_global_id(0) / get_local_size(0));
+
+    {variable_inits}
+
+    {assignment} {function_name}({function_call_inputs});
+
+    {post_function_callbacks}
+''')
+
+
 class CLCodeObject:
     """Interface for basic code objects."""
 
+    __slots__ = ()
+
     def get_cl_code(self):
         """Get the CL code for this code object and all its dependencies, with include guards.
 
@@ -30,6 +74,8 @@ class CLCodeObject:
 class CLFunction(CLCodeObject):
     """Interface for a basic CL function."""
 
+    __slots__ = ()
+
     def is_kernel_func(self):
         """Check if this function is a kernel function or not.
 
@@ -40,7 +86,7 @@ class CLFunction(CLCodeObject):
         """
         raise NotImplementedError()
 
-    def get_kernel_wrapped(self, input_data, nmr_instances, kernel_name=None):
+    def get_kernel_wrapped(self, input_data, nmr_instances, kernel_name=None, workgroup_size=None):
         """Wrap the current CLFunction with a kernel CLFunction.
 
         This may return self if the current function is already a kernel function.
@@ -79,6 +125,9 @@ class CLFunction(CLCodeObject):
                 additional kernel data.
             kernel_name (str): the name of the generated kernel function. If not given it will be called
                 ``kernel_<CLFunction.get_cl_function_name()>``.
+            workgroup_size (int): if the workgroup size the kernel will be executed with is known beforehand,
+                it can be provided here. The generated kernel will then be declared with that required workgroup size,
+                allowing the compiler to optimize for it.
 
         Returns:
             Tuple[CLFunction, Optional[Dict[str, KernelData]]]: A tuple with a CL function with :meth:`is_kernel_func`
@@ -180,6 +229,8 @@ class CLFunction(CLCodeObject):
 
 class SimpleCLCodeObject(CLCodeObject):
 
+    __slots__ = ('_cl_code',)
+
     def __init__(self, cl_code):
         """Simple code object for including type definitions in the kernel.
 
@@ -194,7 +245,11 @@ class SimpleCLCodeObject(CLCodeObject):
 
 class SimpleCLFunction(CLFunction):
 
-    def __init__(self, return_type, cl_function_name, parameter_list, cl_body, dependencies=None, is_kernel_func=False):
+    __slots__ = ('_return_type', '_function_name', '_parameter_list', '_cl_body', '_dependencies', '_is_kernel_func',
+                 '_required_workgroup_size', '_signature', '_cl_code', '_dependency_code', '_hash')
+
+    def __init__(self, return_type, cl_function_name, parameter_list, cl_body, dependencies=None, is_kernel_func=False,
+                 required_workgroup_size=None):
         """A simple implementation of a CL function.
 
         Args:
@@ -206,6 +261,8 @@ class SimpleCLFunction(CLFunction):
             dependencies (Iterable[CLCodeObject]): The CL code objects this function depends on,
                 these will be prepended to the CL code generated by this function.
             is_kernel_func (boolean): if this function should be a kernel function
+            required_workgroup_size (int): only used for kernel functions, if set we declare the kernel with the
+                ``reqd_work_group_size`` attribute. The kernel can then only be executed with this workgroup size.
         """
         super().__init__()
         self._return_type = return_type
@@ -214,7 +271,13 @@ class SimpleCLFunction(CLFunction):
         self._cl_body = cl_body
         self._dependencies = dependencies or []
         self._is_kernel_func = is_kernel_func
-        self._compilation_cache = {}
+        self._required_workgroup_size = required_workgroup_size
+
+        # the function is immutable after construction, so the generated code and the hash can be cached
+        self._signature = None
+        self._cl_code = None
+        self._dependency_code = None
+        self._hash = None
 
     @classmethod
     def from_string(cls, cl_function, dependencies=()):
@@ -243,7 +306,7 @@ class SimpleCLFunction(CLFunction):
     def get_parameters(self):
         return self._parameter_list
 
-    def get_kernel_wrapped(self, input_data, nmr_instances, kernel_name=None):
+    def get_kernel_wrapped(self, input_data, nmr_instances, kernel_name=None, workgroup_size=None):
         if self.is_kernel_func():
             return self
 
@@ -273,45 +336,44 @@ class SimpleCLFunction(CLFunction):
             extra_data = {'__return_values': Zeros((nmr_instances,), self.get_return_type())}
             parameter_list.extend(extra_data['__return_values'].get_kernel_parameters('__return_values'))
 
-        cl_body = '''
-            ulong gid = (ulong)(get_global_id(0) / get_local_size(0));
-
-            ''' + '\n'.join(variable_inits) + '''
-
-            ''' + assignment + ' ' + self.get_cl_function_name() + '(' + ', '.join(function_call_inputs) + ''');
-
-            ''' + '\n'.join(post_function_callbacks) + '''
-        '''
+        cl_body = _kernel_wrapper_template.format(variable_inits='\n'.join(variable_inits),
+                                                  assignment=assignment,
+                                                  function_name=self.get_cl_function_name(),
+                                                  function_call_inputs=', '.join(function_call_inputs),
+                                                  post_function_callbacks='\n'.join(post_function_callbacks))
         func = SimpleCLFunction('void', kernel_name, parameter_list, cl_body,
-                                dependencies=[self], is_kernel_func=True)
+                                dependencies=[self], is_kernel_func=True, required_workgroup_size=workgroup_size)
         return func, extra_data
 
     def get_signature(self):
-        return dedent('{kernel} {return_type} {cl_function_name}({parameters});'.format(
-            kernel='kernel' if self.is_kernel_func() else '',
-            return_type=self.get_return_type(),
-            cl_function_name=self.get_cl_function_name(),
-            parameters=', '.join(self._get_parameter_signatures())))
+        if self._signature is None:
+            self._signature = dedent('{kernel} {return_type} {cl_function_name}({parameters});'.format(
+                kernel=self._get_kernel_qualifier(),
+                return_type=self.get_return_type(),
+                cl_function_name=self.get_cl_function_name(),
+                parameters=', '.join(self._get_parameter_signatures())))
+        return self._signature
 
     def get_cl_code(self):
-        cl_code = dedent('''
-            {kernel} {return_type} {cl_function_name}({parameters}){{
-            {body}
-            }}
-        '''.format(kernel='kernel' if self.is_kernel_func() else '',
-                   return_type=self.get_return_type(),
-                   cl_function_name=self.get_cl_function_name(),
-                   parameters=', '.join(self._get_parameter_signatures()),
-                   body=indent(dedent(self._cl_body), ' '*4*4)))
+        if self._cl_code is None:
+            self._cl_code = self._generate_cl_code()
+        return self._cl_code
+
+    def _generate_cl_code(self):
+        """Generate the CL code for this function and its dependencies.
+
+        Returns:
+            str: the CL code, with include guards
+        """
+        cl_code = _cl_function_template.format(kernel=self._get_kernel_qualifier(),
+                                               return_type=self.get_return_type(),
+                                               cl_function_name=self.get_cl_function_name(),
+                                               parameters=', '.join(self._get_parameter_signatures()),
+                                               body=indent(dedent(self._cl_body), ' ' * 4))
 
-        dependencies = self._get_cl_dependency_code()
-        return dependencies + dedent('''
-            #ifndef {inclusion_guard_name}
-            #define {inclusion_guard_name}
-            {code}
-            #endif // {inclusion_guard_name}
-        '''.format(inclusion_guard_name='INCLUDE_GUARD_{}'.format(self.get_cl_function_name()),
-                   code=indent('\n' + cl_code + '\n', ' ' * 4 * 3)))
+        return self._get_cl_dependency_code() + _include_guard_template.format(
+            inclusion_guard_name='INCLUDE_GUARD_{}'.format(self.get_cl_function_name()),
+            code='\n' + cl_code + '\n')
 
     def get_cl_body(self):
         return self._cl_body
@@ -328,27 +390,38 @@ class SimpleCLFunction(CLFunction):
 
             cl_function = self
             if not self.is_kernel_func():
-                cl_function, extra_data = self.get_kernel_wrapped(kernel_data, nmr_instances)
+                # Without local reduction every device launches workgroups of size one. A requested local size is
+                # capped per device by the kernel's maximum workgroup size, which is only known after compilation,
+                # so in that case we can not declare the workgroup size beforehand.
+                workgroup_size = None
+                if not use_local_reduction:
+                    workgroup_size = 1
+
+                cl_function, extra_data = self.get_kernel_wrapped(kernel_data, nmr_instances,
+                                                                  workgroup_size=workgroup_size)
                 kernel_data.update(extra_data)
 
             return cl_function, kernel_data
 
         def get_kernel_source(cl_function, kernel_data):
-            kernel_source = ''
-            kernel_source += get_cl_utility_definitions(cl_runtime_info.double_precision)
-            kernel_source += '\n'.join(data.get_type_definitions() for data in kernel_data.values())
-            kernel_source += cl_function.get_cl_code()
-            return kernel_source
+            return ''.join([get_cl_utility_definitions(cl_runtime_info.double_precision),
+                            '\n'.join(data.get_type_definitions() for data in kernel_data.values()),
+                            cl_function.get_cl_code()])
 
         def get_kernels(kernel_source, function_name):
-            hashed_source = hash(kernel_source)
+            source_digest = hashlib.sha1(kernel_source.encode('utf-8')).digest()
             kernels = {}
             for env in cl_runtime_info.cl_environments:
-                key = (hashed_source, env.context, cl_runtime_info.compile_flags)
-                if key not in self._compilation_cache:
-                    self._compilation_cache[key] = cl.Program(
-                        env.context, kernel_source).build(' '.join(cl_runtime_info.compile_flags))
-                kernels[env] = getattr(self._compilation_cache[key], function_name)
+                key = (source_digest, env.context, cl_runtime_info.compile_flags)
+                if key in _compilation_cache:
+                    _compilation_cache.move_to_end(key)
+                else:
+                    program = cl.Program(env.context, kernel_source).build(' '.join(cl_runtime_info.compile_flags))
+                    _compilation_cache[key] = program
+                    if len(_compilation_cache) > _compilation_cache_size:
+                        _compilation_cache.popitem(last=False)
+
+                kernels[env] = cl.Kernel(_compilation_cache[key], function_name)
             return kernels
 
         cl_function, kernel_data = resolve_cl_function_and_kernel_data()
@@ -359,11 +432,10 @@ class SimpleCLFunction(CLFunction):
                                          cl_runtime_info.load_balancer, nmr_instances,
                                          use_local_reduction=use_local_reduction,
                                          local_size=local_size, do_data_transfers=do_data_transfers)
-        events = processor.process(wait_for=wait_for)
+        events = processor.process(is_blocking=is_blocking, wait_for=wait_for)
 
         return_data = None
         if is_blocking:
-            processor.finish()
             if self.get_return_type() != 'void':
                 return_data = kernel_data['__return_values'].get_data()
 
@@ -388,16 +460,27 @@ class SimpleCLFunction(CLFunction):
             declarations.append(new_p.get_declaration())
         return declarations
 
+    def _get_kernel_qualifier(self):
+        """Get the qualifier preceding the return type in the function declaration.
+
+        Returns:
+            str: the kernel keyword with the possible kernel attributes, or an empty string for non-kernel functions.
+        """
+        if not self.is_kernel_func():
+            return ''
+        if self._required_workgroup_size:
+            return 'kernel __attribute__((reqd_work_group_size({}, 1, 1)))'.format(self._required_workgroup_size)
+        return 'kernel'
+
     def _get_cl_dependency_code(self):
         """Get the CL code for all the CL code for all the dependencies.
 
         Returns:
             str: The CL code with the actual code.
         """
-        code = ''
-        for d in self._dependencies:
-            code += d.get_cl_code() + "\n"
-        return code
+        if self._dependency_code is None:
+            self._dependency_code = ''.join(d.get_cl_code() + '\n' for d in self._dependencies)
+        return self._dependency_code
 
     @staticmethod
     def _resolve_parameters(parameter_list):
@@ -420,20 +503,188 @@ class SimpleCLFunction(CLFunction):
                    body=indent(dedent(self._cl_body), ' '*4*4)))
 
     def __hash__(self):
-        return hash(self.__repr__())
+        if self._hash is None:
+            self._hash = hash(self._get_identity())
+        return self._hash
 
     def __eq__(self, other):
-        return type(self) == type(other)
+        if self is other:
+            return True
+        if type(self) != type(other):
+            return False
+        return hash(self) == hash(other) and self._get_identity() == other._get_identity()
 
     def __ne__(self, other):
-        return type(self) != type(other)
+        return not self == other
+
+    def _get_identity(self):
+        """Get the fields defining this CL function, used for the hashing and equality.
+
+        Returns:
+            tuple: the type, signature, body and dependencies of this function
+        """
+        return (type(self), self._return_type, self._function_name,
+                tuple(p.get_declaration() for p in self._parameter_list), self._cl_body,
+                tuple(self._dependencies), self._is_kernel_func, self._required_workgroup_size)
 
     def __call__(self, *args, **kwargs):
         return self.evaluate(*args, **kwargs)
 
 
+class BatchedEvaluator:
+
+    def __init__(self, cl_function, max_batch_size=None, use_local_reduction=False, local_size=None,
+                 cl_runtime_info=None):
+        """Evaluate a CL function for multiple sets of inputs in a single kernel run.
+
+        Every call to :meth:`CLFunction.evaluate` has a fixed overhead for generating, retrieving and launching the
+        kernel. When evaluating the same function many times for a few problem instances, this overhead dominates.
+        This class collects the inputs of multiple evaluations and evaluates them at once when flushed, by
+        concatenating the per-instance inputs over the first dimension.
+
+        Array inputs must have the number of problem instances of their submission as first dimension. Scalar inputs
+        which differ between submissions, or which are mixed with array inputs, are expanded to one value per problem
+        instance, in the per-instance shape of the array inputs. Arrays given for pointer parameters are updated in
+        place after the flush, similar to :meth:`CLFunction.evaluate`. If the evaluation fails, the exception is set
+        on the futures of all the submissions in the batch.
+
+        Args:
+            cl_function (CLFunction): the function to evaluate
+            max_batch_size (int): if set, we automatically flush as soon as this many problem instances are pending
+            use_local_reduction (boolean): see :meth:`CLFunction.evaluate`
+            local_size (int): see :meth:`CLFunction.evaluate`
+            cl_runtime_info (mot.configuration.CLRuntimeInfo): see :meth:`CLFunction.evaluate`
+        """
+        self._cl_function = cl_function
+        self._max_batch_size = max_batch_size
+        self._use_local_reduction = use_local_reduction
+        self._local_size = local_size
+        self._cl_runtime_info = cl_runtime_info
+        self._pending = []
+        self._nmr_pending = 0
+
+    def submit(self, inputs, nmr_instances):
+        """Add an evaluation of the CL function to the current batch.
+
+        Args:
+            inputs (Iterable[Union(ndarray, number)] or Mapping[str: Union(ndarray, number)]): for each parameter of the
+                function the input value, as for :meth:`CLFunction.evaluate`. KernelData inputs can not be batched.
+            nmr_instances (int): the number of problem instances in this evaluation
+
+        Returns:
+            concurrent.futures.Future: resolves to the return values of this evaluation after the next flush.
+        """
+        parameters = self._cl_function.get_parameters()
+
+        if isinstance(inputs, Iterable) and not isinstance(inputs, Mapping):
+            inputs = list(inputs)
+            if len(inputs) != len(parameters):
+                raise ValueError('The length of the input list ({}), does not equal '
+                                 'the number of parameters ({})'.format(len(inputs), len(parameters)))
+            inputs = dict(zip([param.name for param in parameters], inputs))
+
+        for param in parameters:
+            if param.name not in inputs:
+                raise ValueError('Missing an input value for the parameter "{}".'.format(param.name))
+
+            value = inputs[param.name]
+            if isinstance(value, KernelData):
+                raise ValueError('The input of parameter "{}" is a KernelData object, '
+                                 'which can not be batched.'.format(param.name))
+            if value is not None and not is_scalar(value) and np.shape(value)[0] != nmr_instances:
+                raise ValueError('The first dimension of the input of parameter "{}" ({}) does not equal '
+                                 'the number of instances ({}).'.format(param.name, np.shape(value)[0],
+                                                                        nmr_instances))
+
+        future = Future()
+        self._pending.append((inputs, nmr_instances, future))
+        self._nmr_pending += nmr_instances
+
+        if self._max_batch_size is not None and self._nmr_pending >= self._max_batch_size:
+            self.flush()
+        return future
+
+    def flush(self):
+        """Evaluate all pending submissions in a single kernel run and resolve their futures."""
+        if not self._pending:
+            return
+
+        pending, self._pending, self._nmr_pending = self._pending, [], 0
+        offsets = np.cumsum([0] + [nmr_instances for _, nmr_instances, _ in pending])
+
+        try:
+            batch_inputs, write_backs = self._get_batch_inputs(pending)
+
+            return_values = self._cl_function.evaluate(
+                batch_inputs, int(offsets[-1]), use_local_reduction=self._use_local_reduction,
+                local_size=self._local_size, cl_runtime_info=self._cl_runtime_info)
+
+            for kernel_data, values in write_backs:
+                data = kernel_data.get_data()
+                for ind, value in enumerate(values):
+                    if isinstance(value, np.ndarray) and value.flags.writeable:
+                        value[...] = np.reshape(data[offsets[ind]:offsets[ind + 1]], value.shape)
+        except Exception as exc:
+            for _, _, future in pending:
+                future.set_exception(exc)
+            raise
+
+        for ind, (_, _, future) in enumerate(pending):
+            if return_values is None:
+                future.set_result(None)
+            else:
+                future.set_result(return_values[offsets[ind]:offsets[ind + 1]])
+
+    def _get_batch_inputs(self, pending):
+        """Concatenate the inputs of the pending submissions into the inputs of a single evaluation.
+
+        Args:
+            pending (list): the pending submissions, as tuples with the inputs, number of instances and future
+
+        Returns:
+            tuple: the dictionary with the batched inputs and a list of (kernel data, submitted values) tuples
+                for the values which need to be updated after the evaluation
+        """
+        batch_inputs = {}
+        write_backs = []
+        for param in self._cl_function.get_parameters():
+            values = [inputs[param.name] for inputs, _, _ in pending]
+
+            if all(value is None for value in values):
+                batch_inputs[param.name] = None
+            elif all(is_scalar(value) for value in values) and all(value == values[0] for value in values):
+                batch_inputs[param.name] = values[0]
+            else:
+                array_shapes = [np.shape(value)[1:] for value in values if value is not None and not is_scalar(value)]
+                instance_shape = array_shapes[0] if array_shapes else ()
+
+                per_instance_values = []
+                for value, (_, nmr_instances, _) in zip(values, pending):
+                    if value is None:
+                        value = 0
+                    if is_scalar(value):
+                        value = np.full((nmr_instances,) + instance_shape, value)
+                    per_instance_values.append(np.asarray(value))
+
+                if len(per_instance_values) == 1:
+                    data = per_instance_values[0]
+                else:
+                    data = np.concatenate(per_instance_values)
+
+                if param.is_pointer_type or param.is_array_type:
+                    batch_inputs[param.name] = Array(data, ctype=param.ctype,
+                                                     mode='r' if param.is_read_only else 'rw')
+                    if not param.is_read_only:
+                        write_backs.append((batch_inputs[param.name], values))
+                else:
+                    batch_inputs[param.name] = data
+        return batch_inputs, write_backs
+
+
 class CLFunctionParameter:
 
+    __slots__ = ()
+
     @property
     def name(self):
         """The name of this parameter.
@@ -540,9 +791,23 @@ class CLFunctionParameter:
         """
         raise NotImplementedError()
 
+    @property
+    def is_read_only(self):
+        """Check if the data of this parameter can not be written to by the function.
+
+        This is the case for data in the ``constant`` address space and for data declared ``const``, like
+        ``global const float* x``. A ``const`` pointer to non-const data, like ``float* const x``, is not read only.
+
+        Returns:
+            boolean: True if the function can not write to the data of this parameter, false otherwise
+        """
+        raise NotImplementedError()
+
     def get_renamed(self, name):
         """Get a copy of the current parameter but then with a new name.
 
+        Since the parameters are immutable, implementations may return the parameter itself if the name is unchanged.
+
         Args:
             name (str): the new name for this parameter
 
@@ -552,26 +817,22 @@ class CLFunctionParameter:
         raise NotImplementedError()
 
 
-_cl_data_type_parser = tatsu.compile('''
-    result = [address_space] {type_qualifiers}* ctype {pointer_star}* {pointer_qualifiers}* name {array_size}*;
-
-    address_space = ['__'] ('local' | 'global' | 'constant' | 'private');
-    type_qualifiers = 'const' | 'volatile';
-
-    basic_ctype = ['unsigned '] /(\w[\w]*[a-zA-Z])/;
-    vector_type_length = '2' | '3' | '4' | '8' | '16';
-    ctype = basic_ctype [vector_type_length];
-    pointer_star = '*';
-
-    pointer_qualifiers = 'const' | 'restrict';
-
-    name = /[\w\_\-\.]+/;
-    array_size = /\[\d+\]/;
-''')
+_cl_data_type_regex = re.compile(r'''
+    ^\s*
+    (?P<qualifiers>(?:(?:(?:__)?(?:local|global|constant|private)|const|volatile)\s+)*)
+    (?P<basic_ctype>(?:unsigned\s+)?\w*?[a-zA-Z])(?P<vector_type_length>2|3|4|8|16)?(?!\w)
+    \s*(?P<pointer_stars>(?:\*\s*)*)
+    (?P<pointer_qualifiers>(?:(?:const|restrict)\s+)*)
+    (?P<name>[\w\-.]+)
+    \s*(?P<array_sizes>(?:\[\s*\d+\s*\]\s*)*)$
+''', re.VERBOSE)
 
 
 class SimpleCLFunctionParameter(CLFunctionParameter):
 
+    __slots__ = ('_address_space', '_type_qualifiers', '_basic_ctype', '_vector_type_length', '_nmr_pointer_stars',
+                 '_pointer_qualifiers', '_name', '_array_sizes', '_declaration')
+
     def __init__(self, declaration):
         """Creates a new function parameter for the CL functions.
 
@@ -586,81 +847,69 @@ class SimpleCLFunctionParameter(CLFunctionParameter):
         self._pointer_qualifiers = []
         self._name = ''
         self._array_sizes = []
+        self._declaration = None  # cached result of get_declaration()
 
-        param = self
-
-        class Semantics:
-
-            def type_qualifiers(self, ast):
-                if ast in param._type_qualifiers:
-                    raise ValueError('The pre-type qualifier "{}" is present multiple times.'.format(ast))
-                param._type_qualifiers.append(ast)
-                return ast
+        match = _cl_data_type_regex.match(declaration)
+        if match is None:
+            raise ValueError('Could not parse the parameter declaration "{}".'.format(declaration))
 
-            def address_space(self, ast):
-                param._address_space = ''.join(ast)
-                return ''.join(ast)
-
-            def basic_ctype(self, ast):
-                if isinstance(ast, tuple):
-                    param._basic_ctype = ' '.join(ast)
-                else:
-                    param._basic_ctype = ast
-                return ast
-
-            def vector_type_length(self, ast):
-                param._vector_type_length = int(ast)
-                return ast
-
-            def pointer_star(self, ast):
-                param._nmr_pointer_stars += 1
-                return ast
-
-            def pointer_qualifiers(self, ast):
-                if ast in param._pointer_qualifiers:
-                    raise ValueError('The pre-type qualifier "{}" is present multiple times.'.format(ast))
-                param._pointer_qualifiers.append(ast)
-                return ast
-
-            def name(self, ast):
-                param._name = ast
-                return ast
+        for qualifier in match.group('qualifiers').split():
+            if qualifier in ('const', 'volatile'):
+                if qualifier in self._type_qualifiers:
+                    raise ValueError('The pre-type qualifier "{}" is present multiple times.'.format(qualifier))
+                self._type_qualifiers.append(qualifier)
+            else:
+                self._address_space = qualifier
 
-            def array_size(self, ast):
-                param._array_sizes.append(int(ast[1:-1]))
-                return ast
+        for qualifier in match.group('pointer_qualifiers').split():
+            if qualifier in self._pointer_qualifiers:
+                raise ValueError('The pre-type qualifier "{}" is present multiple times.'.format(qualifier))
+            self._pointer_qualifiers.append(qualifier)
 
-        _cl_data_type_parser.parse(declaration, semantics=Semantics())
+        self._basic_ctype = ' '.join(match.group('basic_ctype').split())
+        if match.group('vector_type_length'):
+            self._vector_type_length = int(match.group('vector_type_length'))
+        self._nmr_pointer_stars = match.group('pointer_stars').count('*')
+        self._name = match.group('name')
+        self._array_sizes = [int(size) for size in re.findall(r'\d+', match.group('array_sizes'))]
 
     @property
     def name(self):
         return self._name
 
     def get_renamed(self, name):
+        if name == self._name:
+            return self  # the parameters are immutable, no need for a copy
+
         new_param = copy(self)
         new_param._name = name
+        new_param._declaration = None
         return new_param
 
     def get_declaration(self):
+        if self._declaration is not None:
+            return self._declaration
+
         declaration = ''
 
         if self._address_space:
-            declaration += str(self._address_space) + ' '
+            declaration += self._address_space + ' '
 
         if self._type_qualifiers:
-            declaration += str(' '.join(self._type_qualifiers)) + ' '
+            declaration += ' '.join(self._type_qualifiers) + ' '
 
-        declaration += str(self.ctype)
+        declaration += self.ctype
         declaration += '*' * self._nmr_pointer_stars
 
         if self._pointer_qualifiers:
-            declaration += ' ' + str(' '.join(self._pointer_qualifiers)) + ' '
+            declaration += ' ' + ' '.join(self._pointer_qualifiers) + ' '
 
         declaration += ' ' + self._name
 
         for s in self._array_sizes:
             declaration += '[{}]'.format(s)
 
+        self._declaration = declaration
         return declaration
 
     @property
@@ -700,3 +949,7 @@ class SimpleCLFunctionParameter(CLFunctionParameter):
     @property
     def is_array_type(self):
         return len(self.array_sizes) > 0
+
+    @property
+    def is_read_only(self):
+        return 'const' in self._type_qualifiers or self.address_space.lstrip('_') == 'constant'
@@ -4,8 +4,22 @@ __maintainer__ = 'Robbert Harms'
 __email__ = 'robbert@xkls.nl'
 __licence__ = 'LGPL v3'
 
+from collections import OrderedDict
 import pyopencl as cl
 
+from mot.lib.utils import merge_cl_events, wait_for_cl_events
+
+
+_work_group_info_cache = OrderedDict()
+"""Cache of the work group information queried per kernel function and device.
+
+Since every evaluation creates its own kernel objects, this is keyed by the program and the name of the kernel function.
+Next to the queried value we store the program itself. This keeps the program handle alive while it is used as a key,
+such that it can not be reused by another program. The cache is bounded, the least recently used items are removed first.
+"""
+
+_work_group_info_cache_size = 256
+
 
 class Processor:
 
@@ -50,6 +64,7 @@ class MultiDeviceProcessor(Processor):
                  evaluating this function. If this is set to True we will multiply the global size
                  (given by the nmr_instances) by the work group sizes.
             local_size (int): can be used to specify the exact local size (workgroup size) the kernel must use.
+                This is capped to the maximum workgroup size the device supports for the kernel.
             do_data_transfers (boolean): if we should do data transfers from host to device and back for evaluating
                 this function. For better control set this to False and use the method
                 ``enqueue_device_access()`` and ``enqueue_host_access`` of the KernelData to set the data.
@@ -64,11 +79,14 @@ class MultiDeviceProcessor(Processor):
             kernel = kernels[cl_environment]
 
             if use_local_reduction:
+                max_workgroup_size = _get_work_group_info(
+                    kernel, cl.kernel_work_group_info.WORK_GROUP_SIZE, cl_environment.device)
                 if local_size:
-                    workgroup_size = local_size
+                    workgroup_size = min(local_size, max_workgroup_size)
                 else:
-                    workgroup_size = kernel.get_work_group_info(
-                        cl.kernel_work_group_info.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, cl_environment.device)
+                    workgroup_size = min(_get_work_group_info(
+                        kernel, cl.kernel_work_group_info.PREFERRED_WORK_GROUP_SIZE_MULTIPLE, cl_environment.device),
+                        max_workgroup_size)
             else:
                 workgroup_size = 1
 
@@ -81,9 +99,9 @@ class MultiDeviceProcessor(Processor):
 
     def process(self, is_blocking=False, wait_for=None):
         if self._do_data_transfers:
-            for ind, kernel_data in enumerate(self._kernel_data.values()):
-                wait_for = kernel_data.enqueue_device_access(self._cl_environments, is_blocking=False,
-                                                             wait_for=wait_for)
+            wait_for = merge_cl_events(
+                [kernel_data.enqueue_device_access(self._cl_environments, is_blocking=False, wait_for=wait_for)
+                 for kernel_data in self._kernel_data.values()], self._cl_environments, previous_events=wait_for)
 
         events = {}
         for worker in self._subprocessors:
@@ -91,8 +109,12 @@ class MultiDeviceProcessor(Processor):
             worker.flush()
 
         if self._do_data_transfers:
-            for ind, kernel_data in enumerate(self._kernel_data.values()):
-                events = kernel_data.enqueue_host_access(self._cl_environments, is_blocking=False, wait_for=events)
+            events = merge_cl_events(
+                [kernel_data.enqueue_host_access(self._cl_environments, is_blocking=False, wait_for=events)
+                 for kernel_data in self._kernel_data.values()], self._cl_environments, previous_events=events)
+
+        if is_blocking and events:
+            wait_for_cl_events(events)
 
         return events
 
@@ -175,9 +197,13 @@ class DeviceAccess(Processor):
         self._cl_environments = cl_environments
 
     def process(self, is_blocking=False, wait_for=None):
-        events = None
-        for ind, kernel_data in enumerate(self._kernel_data):
-            events = kernel_data.enqueue_device_access(self._cl_environments, is_blocking=False, wait_for=wait_for)
+        events = merge_cl_events(
+            [kernel_data.enqueue_device_access(self._cl_environments, is_blocking=False, wait_for=wait_for)
+             for kernel_data in self._kernel_data], self._cl_environments, previous_events=wait_for)
+
+        if is_blocking:
+            wait_for_cl_events(events)
+
         return events
 
     def flush(self):
@@ -203,9 +229,13 @@ class HostAccess(Processor):
         self._cl_environments = cl_environments
 
     def process(self, is_blocking=False, wait_for=None):
-        events = None
-        for ind, kernel_data in enumerate(self._kernel_data):
-            events = kernel_data.enqueue_host_access(self._cl_environments, is_blocking=False, wait_for=wait_for)
+        events = merge_cl_events(
+            [kernel_data.enqueue_host_access(self._cl_environments, is_blocking=False, wait_for=wait_for)
+             for kernel_data in self._kernel_data], self._cl_environments, previous_events=wait_for)
+
+        if is_blocking:
+            wait_for_cl_events(events)
+
         return events
 
     def flush(self):
@@ -215,3 +245,25 @@ class HostAccess(Processor):
     def finish(self):
         for env in self._cl_environments:
             env.queue.finish()
+
+
+def _get_work_group_info(kernel, param, device):
+    """Get the work group information of a kernel for a device, caching the result.
+
+    Args:
+        kernel (pyopencl.Kernel): the kernel to query
+        param (int): the ``pyopencl.kernel_work_group_info`` parameter to query
+        device (pyopencl.Device): the device to query the kernel for
+
+    Returns:
+        the queried work group information
+    """
+    program = kernel.program
+    key = (program.int_ptr, kernel.function_name, device.int_ptr, param)
+    if key in _work_group_info_cache:
+        _work_group_info_cache.move_to_end(key)
+    else:
+        _work_group_info_cache[key] = (program, kernel.get_work_group_info(param, device))
+        if len(_work_group_info_cache) > _work_group_info_cache_size:
+            _work_group_info_cache.popitem(last=False)
+    return _work_group_info_cache[key][1]
@@ -6,7 +6,8 @@ import numpy as np
 import pyopencl as cl
 
 from mot.lib.cl_environments import CLEnvironment
-from mot.lib.utils import dtype_to_ctype, ctype_to_dtype, convert_data_to_dtype, is_vector_ctype, split_vector_ctype
+from mot.lib.utils import dtype_to_ctype, ctype_to_dtype, convert_data_to_dtype, is_vector_ctype, split_vector_ctype, \
+    merge_cl_events, wait_for_cl_events
 
 __author__ = 'Robbert Harms'
 __date__ = '2018-04-09'
@@ -15,6 +16,11 @@ __email__ = 'robbert@xkls.nl'
 __licence__ = 'LGPL v3'
 
 
+_VECTOR_LOADABLE_CTYPES = ('char', 'uchar', 'unsigned char', 'short', 'ushort', 'unsigned short', 'int', 'uint',
+                           'unsigned int', 'long', 'ulong', 'unsigned long', 'float', 'double', 'mot_float_type')
+"""The scalar types supported by the ``vloadn`` and ``vstoren`` vector data load and store functions."""
+
+
 class KernelData:
 
     @property
@@ -367,15 +373,23 @@ class Struct(KernelData):
         return parameters
 
     def enqueue_host_access(self, cl_environments, is_blocking=True, wait_for=None):
-        events = {}
-        for d in self._elements.values():
-            events.update(d.enqueue_host_access(cl_environments, is_blocking=is_blocking, wait_for=wait_for))
+        if isinstance(cl_environments, CLEnvironment):
+            cl_environments = [cl_environments]
+
+        events = merge_cl_events([d.enqueue_host_access(cl_environments, is_blocking=False, wait_for=wait_for)
+                                  for d in self._elements.values()], cl_environments)
+        if is_blocking and events:
+            wait_for_cl_events(events)
         return events
 
     def enqueue_device_access(self, cl_environments, is_blocking=True, wait_for=None):
-        events = {}
-        for d in self._elements.values():
-            events.update(d.enqueue_device_access(cl_environments, is_blocking=is_blocking, wait_for=wait_for))
+        if isinstance(cl_environments, CLEnvironment):
+            cl_environments = [cl_environments]
+
+        events = merge_cl_events([d.enqueue_device_access(cl_environments, is_blocking=False, wait_for=wait_for)
+                                  for d in self._elements.values()], cl_environments)
+        if is_blocking and events:
+            wait_for_cl_events(events)
         return events
 
     def get_kernel_inputs(self, cl_environment, workgroup_size):
@@ -430,8 +444,8 @@ class Scalar(KernelData):
 
     def get_data(self):
         if self._ctype.startswith('mot_float_type'):
-            return np.asscalar(self._value.astype(self._mot_float_dtype))
-        return np.asscalar(self._value)
+            return self._value.astype(self._mot_float_dtype).item()
+        return self._value.item()
 
     def get_children(self):
         return []
@@ -658,7 +672,7 @@ class LocalMemory(KernelData):
 class Array(KernelData):
 
     def __init__(self, data, ctype=None, as_scalar=False, parallelize_over_first_dimension=True,
-                 mode='rw', use_host_ptr=True):
+                 mode='rw', use_host_ptr=True, half_storage=False):
         """Loads the given array as a buffer into one or more OpenCL contexts.
 
         By default, this expects multi-dimensional arrays (n, m, k, ...) which holds a (m, k, ...) for every data
@@ -669,6 +683,10 @@ class Array(KernelData):
         data's dtype does not match the ctype, we will convert the data to the righ dtype. If the ctype is set
         to mot_float_type and the mot_float_type changes, then a new Array data class is returned.
 
+        Since the device buffers require contiguous memory, data which is not C-contiguous (for example a strided
+        view) is copied once at construction. In that case the results of the computations are written to this copy,
+        which is available using :meth:`get_data`.
+
         Args:
             data (ndarray): the data to load in the kernel
             ctype (str): the desired c-type for in use in the kernel, like ``int``, ``float`` or ``mot_float_type``.
@@ -683,19 +701,35 @@ class Array(KernelData):
                 This defines how the device is planned on accessing this array, and, defines if we will read the
                 data back after applying a kernel (if 'w' is included we will write data back, else, not).
             use_host_ptr (boolean): if set, we will use the USE_HOST_PTR flag and use map/unmap for data transfers
-                if not set, we create a device side buffer and use explicit read and write commands to transfer the data
+                if not set, we create a device side buffer and use explicit read and write commands to transfer the data.
+                On devices sharing their memory with the host we always use the host pointer, since there the
+                map/unmap paradigm is zero-copy.
+            half_storage (boolean): if set, the data is stored in half precision on the host and the device, halving
+                the memory traffic for large floating point arrays. The data is converted to and from the ctype,
+                which must be ``float``, ``double`` or ``mot_float_type``, when it is loaded into private or local
+                memory, or when it is loaded as a scalar. Such data can therefore not be passed as a global pointer.
         """
         if isinstance(data, (list, tuple)):
             data = np.array(data)
 
+        if half_storage and ctype not in ('float', 'double', 'mot_float_type'):
+            raise ValueError('Half precision storage is only supported for the ctypes float, double '
+                             'and mot_float_type, "{}" given.'.format(ctype))
+
         self._mode = mode
         self._is_readable = 'r' in mode
         self._is_writable = 'w' in mode
 
         self._data = data
-        if ctype and not ctype.startswith('mot_float_type'):
+        self._half_storage = half_storage
+        if half_storage:
+            self._data = convert_data_to_dtype(self._data, 'half')
+        elif ctype and not ctype.startswith('mot_float_type'):
             self._data = convert_data_to_dtype(self._data, ctype)
 
+        # the buffers and transfers require a single contiguous block of memory, copy only if needed
+        self._data = np.require(self._data, requirements='C')
+
         self._ctype = ctype or dtype_to_ctype(self._data.dtype)
         self._mot_float_dtype = None
         self._backup_data_reference = None
@@ -737,7 +771,7 @@ class Array(KernelData):
             return Array(self._data[batch_range[0]:batch_range[1]], ctype=self._ctype,
                          mode=self._mode, as_scalar=self._as_scalar,
                          parallelize_over_first_dimension=self._parallelize_over_first_dimension,
-                         use_host_ptr=self._use_host_ptr)
+                         use_host_ptr=self._use_host_ptr, half_storage=self._half_storage)
 
         def is_consecutive(l):
             return np.sum(np.diff(np.sort(l)) == 1) >= (len(l) - 1)
@@ -746,17 +780,20 @@ class Array(KernelData):
             return Array(self._data[problem_indices[0]:(problem_indices[-1] + 1)], ctype=self._ctype,
                          mode=self._mode, as_scalar=self._as_scalar,
                          parallelize_over_first_dimension=self._parallelize_over_first_dimension,
-                         use_host_ptr=self._use_host_ptr)
+                         use_host_ptr=self._use_host_ptr, half_storage=self._half_storage)
 
         return Array(self._data[problem_indices], ctype=self._ctype,
                      mode=self._mode, as_scalar=self._as_scalar,
                      parallelize_over_first_dimension=self._parallelize_over_first_dimension,
-                     use_host_ptr=self._use_host_ptr)
+                     use_host_ptr=self._use_host_ptr, half_storage=self._half_storage)
 
     def set_mot_float_dtype(self, mot_float_dtype):
+        if mot_float_dtype == self._mot_float_dtype and self._backup_data_reference is None:
+            # the source data is used as is, a converted copy would go stale if the source data is modified
+            return
         self._mot_float_dtype = mot_float_dtype
 
-        if self._ctype.startswith('mot_float_type'):
+        if self._ctype.startswith('mot_float_type') and not self._half_storage:
             if self._backup_data_reference is not None:
                 self._data = self._backup_data_reference
                 self._backup_data_reference = None
@@ -790,36 +827,39 @@ class Array(KernelData):
 
     def initialize_variable(self, variable_name, kernel_param_name, problem_id_substitute, address_space):
         if not self._as_scalar:
+            if not self._is_readable and address_space in ('private', 'local'):
+                # write only data, there is nothing to load
+                return '{} {} {}[{}];'.format(address_space, self._ctype, variable_name, self._data_length)
+
             if address_space == 'private':
                 return '''
                     private {ctype} {v_name}[{nmr_elements}];
-
-                    for(uint i = 0; i < {nmr_elements}; i++){{
-                        {v_name}[i] = {k_name}[{offset} + i];
-                    }}
-                '''.format(ctype=self._ctype, v_name=variable_name, k_name=kernel_param_name,
-                           nmr_elements=self._data_length,
-                           offset=self._get_offset_str(problem_id_substitute))
+                    {copy_loop}
+                '''.format(ctype=self._ctype, v_name=variable_name, nmr_elements=self._data_length,
+                           copy_loop=_get_copy_loop(
+                               self._ctype, self._data_length,
+                               variable_name, kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute),
+                               half_storage=self._get_half_storage_side('source')))
             elif address_space == 'local':
                 return '''
                     local {ctype} {v_name}[{nmr_elements}];
-
-                    if(get_local_id(0) == 0){{
-                        for(uint i = 0; i < {nmr_elements}; i++){{
-                            {v_name}[i] = {k_name}[{offset} + i];
-                        }}
-                    }}
-                    barrier(CLK_LOCAL_MEM_FENCE);
-                '''.format(ctype=self._ctype, v_name=variable_name, k_name=kernel_param_name,
-                           nmr_elements=self._data_length,
-                           offset=self._get_offset_str(problem_id_substitute))
+                    {copy}
+                '''.format(ctype=self._ctype, v_name=variable_name, nmr_elements=self._data_length,
+                           copy=_get_work_group_copy(
+                               self._ctype, self._data_length,
+                               variable_name, kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute),
+                               half_storage=self._get_half_storage_side('source')))
         return ''
 
     def get_function_call_input(self, variable_name, kernel_param_name, problem_id_substitute, address_space):
         if self._as_scalar:
+            if self._half_storage:
+                return 'vload_half({}, {})'.format(self._get_offset_str(problem_id_substitute), kernel_param_name)
             return '{}[{}]'.format(kernel_param_name, self._get_offset_str(problem_id_substitute))
         else:
             if address_space == 'global':
+                if self._half_storage:
+                    raise ValueError('Data stored in half precision can not be passed as a global pointer.')
                 return '{} + {}'.format(kernel_param_name, self._get_offset_str(problem_id_substitute))
             elif address_space == 'private':
                 return variable_name
@@ -830,34 +870,32 @@ class Array(KernelData):
         if self._is_writable:
             if not self._as_scalar:
                 if address_space == 'private':
-                    return '''
-                        for(uint i = 0; i < {nmr_elements}; i++){{
-                            {k_name}[{offset} + i] = {v_name}[i];
-                        }}
-                    '''.format(v_name=variable_name, k_name=kernel_param_name,
-                               nmr_elements=self._data_length, offset=self._get_offset_str(problem_id_substitute))
+                    return _get_copy_loop(
+                        self._ctype, self._data_length,
+                        kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute), variable_name,
+                        half_storage=self._get_half_storage_side('target'))
                 elif address_space == 'local':
                     return '''
-                        if(get_local_id(0) == 0){{
-                            for(uint i = 0; i < {nmr_elements}; i++){{
-                                {k_name}[{offset} + i] = {v_name}[i];
-                            }}
-                        }}
-                    '''.format(v_name=variable_name, k_name=kernel_param_name,
-                               nmr_elements=self._data_length,
-                               offset=self._get_offset_str(problem_id_substitute))
+                        barrier(CLK_LOCAL_MEM_FENCE);
+                        {copy}
+                    '''.format(copy=_get_work_group_copy(
+                        self._ctype, self._data_length,
+                        kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute), variable_name,
+                        half_storage=self._get_half_storage_side('target')))
         return ''
 
     def get_struct_declaration(self, name):
         if self._as_scalar:
             return '{} {};'.format(self._ctype, name)
-        return 'global {}* restrict {};'.format(self._ctype, name)
+        return 'global {}* restrict {};'.format(self._get_storage_ctype(), name)
 
     def get_struct_initialization(self, variable_name, kernel_param_name, problem_id_substitute):
+        if self._half_storage and not self._as_scalar:
+            return '{} + {}'.format(kernel_param_name, self._get_offset_str(problem_id_substitute))
         return self.get_function_call_input(variable_name, kernel_param_name, problem_id_substitute, 'global')
 
     def get_kernel_parameters(self, kernel_param_name):
-        return ['global {}* restrict {}'.format(self._ctype, kernel_param_name)]
+        return ['global {}* restrict {}'.format(self._get_storage_ctype(), kernel_param_name)]
 
     def enqueue_host_access(self, cl_environments, is_blocking=True, wait_for=None):
         if isinstance(cl_environments, CLEnvironment):
@@ -879,7 +917,7 @@ class Array(KernelData):
                         wait_list.append(wait_event)
 
                 if not any(e.context is env.context for e in events.keys()):
-                    if self._use_host_ptr:
+                    if self._uses_host_ptr(env):
                         _, event = cl.enqueue_map_buffer(
                             env.queue, self._buffer_cache[context],
                             cl.map_flags.READ, 0, self._data.shape, self._data.dtype,
@@ -890,9 +928,8 @@ class Array(KernelData):
 
                     events[env] = event
 
-        if is_blocking:
-            for env in cl_environments:
-                env.queue.finish()
+        if is_blocking and events:
+            wait_for_cl_events(events)
 
         return events
 
@@ -906,23 +943,24 @@ class Array(KernelData):
         wait_for = wait_for or {}
         events = {}
 
-        if not self._use_host_ptr:
-            for env in cl_environments:
-                context = env.context
+        for env in cl_environments:
+            if self._uses_host_ptr(env):
+                continue
 
-                wait_list = []
-                for wait_env, wait_event in wait_for.items():
-                    if wait_env.context is context:
-                        wait_list.append(wait_event)
+            context = env.context
 
-                if not any(e.context is env.context for e in events.keys()):
-                    event = cl.enqueue_copy(env.queue, self._buffer_cache[context], self._data,
-                                            is_blocking=False, wait_for=wait_list)
-                    events[env] = event
+            wait_list = []
+            for wait_env, wait_event in wait_for.items():
+                if wait_env.context is context:
+                    wait_list.append(wait_event)
 
-        if is_blocking:
-            for env in cl_environments:
-                env.queue.finish()
+            if not any(e.context is env.context for e in events.keys()):
+                event = cl.enqueue_copy(env.queue, self._buffer_cache[context], self._data,
+                                        is_blocking=False, wait_for=wait_list)
+                events[env] = event
+
+        if is_blocking and events:
+            wait_for_cl_events(events)
 
         return events
 
@@ -939,12 +977,12 @@ class Array(KernelData):
         cl_context = cl_environment.context
 
         if cl_context not in self._buffer_cache:
-            if self._use_host_ptr:
+            if self._uses_host_ptr(cl_environment):
                 self._buffer_cache[cl_context] = cl.Buffer(cl_context,
                                                            get_mem_flags() | cl.mem_flags.USE_HOST_PTR,
                                                            hostbuf=self._data)
             else:
-                self._buffer_cache[cl_context] = cl.Buffer(cl_context, get_mem_flags(), size=self._data.nbytes)
+                self._buffer_cache[cl_context] = cl_environment.memory_pool.allocate(self._data.nbytes)
 
         return [self._buffer_cache[cl_context]]
 
@@ -953,11 +991,45 @@ class Array(KernelData):
 
     def _get_offset_str(self, problem_id_substitute):
         if self._parallelize_over_first_dimension:
-            offset_str = str(self._data_length) + ' * {problem_id}'
+            offset_str = _get_offset_arithmetic(self._data_length, self._data.size)
         else:
             offset_str = '0'
         return offset_str.replace('{problem_id}', problem_id_substitute)
 
+    def _uses_host_ptr(self, cl_environment):
+        """Check if we use a host pointer backed buffer for the given environment.
+
+        Args:
+            cl_environment (mot.lib.cl_environments.CLEnvironment): the environment to check
+
+        Returns:
+            boolean: if we use ``USE_HOST_PTR`` and map/unmap for this environment, or device buffers and copies.
+        """
+        return self._use_host_ptr or cl_environment.has_unified_memory
+
+    def _get_storage_ctype(self):
+        """Get the ctype in which the data is stored in the buffers.
+
+        Returns:
+            str: ``half`` if we use half precision storage, else the ctype of this array
+        """
+        if self._half_storage:
+            return 'half'
+        return self._ctype
+
+    def _get_half_storage_side(self, side):
+        """Get the half storage argument for the copy loops.
+
+        Args:
+            side (str): the side of the copy on which the global data resides, ``'source'`` or ``'target'``
+
+        Returns:
+            str: the given side if we use half precision storage, else None
+        """
+        if self._half_storage:
+            return side
+        return None
+
 
 class Zeros(KernelData):
 
@@ -1052,29 +1124,27 @@ class Zeros(KernelData):
             return self._array.initialize_variable(variable_name, kernel_param_name,
                                                    problem_id_substitute, address_space)
 
+        if not self._is_readable and address_space in ('private', 'local'):
+            # write only data, there is nothing to load
+            return '{} {} {}[{}];'.format(address_space, self._ctype, variable_name, self._data_length)
+
         if address_space == 'private':
             return '''
                 private {ctype} {v_name}[{nmr_elements}];
-
-                for(uint i = 0; i < {nmr_elements}; i++){{
-                    {v_name}[i] = {k_name}[{offset} + i];
-                }}
-            '''.format(ctype=self._ctype, v_name=variable_name, k_name=kernel_param_name,
-                       nmr_elements=self._data_length,
-                       offset=self._get_offset_str(problem_id_substitute))
+                {copy_loop}
+            '''.format(ctype=self._ctype, v_name=variable_name, nmr_elements=self._data_length,
+                       copy_loop=_get_copy_loop(
+                           self._ctype, self._data_length,
+                           variable_name, kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute)))
         elif address_space == 'local':
             return '''
                 local {ctype} {v_name}[{nmr_elements}];
-
-                if(get_local_id(0) == 0){{
-                    for(uint i = 0; i < {nmr_elements}; i++){{
-                        {v_name}[i] = {k_name}[{offset} + i];
-                    }}
-                }}
-                barrier(CLK_LOCAL_MEM_FENCE);
-            '''.format(ctype=self._ctype, v_name=variable_name, k_name=kernel_param_name,
-                       nmr_elements=self._data_length,
-                       offset=self._get_offset_str(problem_id_substitute))
+                {copy}
+            '''.format(ctype=self._ctype, v_name=variable_name, nmr_elements=self._data_length,
+                       copy=_get_work_group_copy(
+                           self._ctype, self._data_length,
+                           variable_name, kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute)))
+        return ''
 
     def get_function_call_input(self, variable_name, kernel_param_name, problem_id_substitute, address_space):
         if self._host_accessible:
@@ -1095,22 +1165,16 @@ class Zeros(KernelData):
 
         if self._is_writable:
             if address_space == 'private':
-                return '''
-                    for(uint i = 0; i < {nmr_elements}; i++){{
-                        {k_name}[{offset} + i] = {v_name}[i];
-                    }}
-                '''.format(v_name=variable_name, k_name=kernel_param_name,
-                           nmr_elements=self._data_length, offset=self._get_offset_str(problem_id_substitute))
+                return _get_copy_loop(
+                    self._ctype, self._data_length,
+                    kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute), variable_name)
             elif address_space == 'local':
                 return '''
-                    if(get_local_id(0) == 0){{
-                        for(uint i = 0; i < {nmr_elements}; i++){{
-                            {k_name}[{offset} + i] = {v_name}[i];
-                        }}
-                    }}
-                '''.format(v_name=variable_name, k_name=kernel_param_name,
-                           nmr_elements=self._data_length,
-                           offset=self._get_offset_str(problem_id_substitute))
+                    barrier(CLK_LOCAL_MEM_FENCE);
+                    {copy}
+                '''.format(copy=_get_work_group_copy(
+                    self._ctype, self._data_length,
+                    kernel_param_name + ' + ' + self._get_offset_str(problem_id_substitute), variable_name))
         return ''
 
     def get_struct_declaration(self, name):
@@ -1148,15 +1212,7 @@ class Zeros(KernelData):
         itemsize = dtype.itemsize
 
         if cl_context not in self._buffer_cache:
-            if self._is_writable:
-                if self._is_readable:
-                    flags = cl.mem_flags.READ_WRITE
-                else:
-                    flags = cl.mem_flags.WRITE_ONLY
-            else:
-                flags = cl.mem_flags.READ_ONLY
-
-            buffer = cl.Buffer(cl_context, flags, size=np.prod(self._shape) * itemsize)
+            buffer = cl_environment.memory_pool.allocate(np.prod(self._shape) * itemsize)
 
             cl.enqueue_fill_buffer(cl_environment.queue, buffer,
                                    np.zeros(1, dtype=dtype), 0, np.prod(self._shape) * itemsize)
@@ -1170,7 +1226,7 @@ class Zeros(KernelData):
 
     def _get_offset_str(self, problem_id_substitute):
         if self._parallelize_over_first_dimension:
-            offset_str = str(self._data_length) + ' * {problem_id}'
+            offset_str = _get_offset_arithmetic(self._data_length, np.prod(self._shape))
         else:
             offset_str = '0'
         return offset_str.replace('{problem_id}', problem_id_substitute)
@@ -1182,7 +1238,9 @@ class CompositeArray(KernelData):
         """An array filled with the given kernel data elements.
 
         Each of the given elements should be a :class:`Scalar` or an :class:`Array` with the property `as_scalar`
-        set to True. We will load each value of the given elements into a private array.
+        set to True. We will load each value of the given elements into a private array. Elements may also be
+        an :class:`Array` holding multiple values per problem instance, these values then fill consecutive positions
+        of the array. This allows loading many per-problem values from a single buffer.
 
         Args:
             elements (List[KernelData]): the kernel data elements to load into the private array
@@ -1192,13 +1250,16 @@ class CompositeArray(KernelData):
         self._elements = elements
         self._ctype = ctype
         self._address_space = address_space
+        self._element_lengths = [element._data_length if isinstance(element, Array) and not element._as_scalar else 1
+                                 for element in self._elements]
+        nmr_items = sum(self._element_lengths)
 
         if self._address_space == 'private':
-            self._composite_array = PrivateMemory(len(self._elements), self._ctype)
+            self._composite_array = PrivateMemory(nmr_items, self._ctype)
         elif self._address_space == 'local':
-            self._composite_array = LocalMemory(self._ctype, len(self._elements))
+            self._composite_array = LocalMemory(self._ctype, nmr_items)
         elif self._address_space == 'global':
-            self._composite_array = Zeros(len(self._elements), self._ctype, mode='rw',
+            self._composite_array = Zeros(nmr_items, self._ctype, mode='rw',
                                           parallelize_over_first_dimension=False)
 
     @property
@@ -1232,17 +1293,25 @@ class CompositeArray(KernelData):
         return_str = self._composite_array.initialize_variable(variable_name, kernel_param_name,
                                                                problem_id_substitute, address_space)
 
-        for ind, data in enumerate(self._elements):
+        position = 0
+        for ind, (data, length) in enumerate(zip(self._elements, self._element_lengths)):
             return_str += data.initialize_variable('{}_{}'.format(variable_name, str(ind)),
                                                    '{}_{}'.format(kernel_param_name, str(ind)),
                                                    problem_id_substitute, 'global')
 
-            return_str += '{}[{}] = {};\n'.format(
-                kernel_param_name,
-                ind,
-                data.get_struct_initialization(
-                    '{}_{}'.format(variable_name, str(ind)),
-                    '{}_{}'.format(kernel_param_name, str(ind)), problem_id_substitute))
+            element_value = data.get_struct_initialization(
+                '{}_{}'.format(variable_name, str(ind)),
+                '{}_{}'.format(kernel_param_name, str(ind)), problem_id_substitute)
+
+            if length == 1:
+                return_str += '{}[{}] = {};\n'.format(kernel_param_name, position, element_value)
+            elif self._address_space == 'local':
+                return_str += _get_work_group_copy(self._ctype, length,
+                                                   '{} + {}'.format(kernel_param_name, position), element_value)
+            else:
+                return_str += _get_copy_loop(self._ctype, length,
+                                             '{} + {}'.format(kernel_param_name, position), element_value)
+            position += length
 
         return return_str
 
@@ -1267,15 +1336,23 @@ class CompositeArray(KernelData):
         return parameters
 
     def enqueue_host_access(self, cl_environments, is_blocking=True, wait_for=None):
-        events = {}
-        for d in self._elements:
-            events.update(d.enqueue_host_access(cl_environments, is_blocking=is_blocking, wait_for=wait_for))
+        if isinstance(cl_environments, CLEnvironment):
+            cl_environments = [cl_environments]
+
+        events = merge_cl_events([d.enqueue_host_access(cl_environments, is_blocking=False, wait_for=wait_for)
+                                  for d in self._elements], cl_environments)
+        if is_blocking and events:
+            wait_for_cl_events(events)
         return events
 
     def enqueue_device_access(self, cl_environments, is_blocking=True, wait_for=None):
-        events = {}
-        for d in self._elements:
-            events.update(d.enqueue_device_access(cl_environments, is_blocking=is_blocking, wait_for=wait_for))
+        if isinstance(cl_environments, CLEnvironment):
+            cl_environments = [cl_environments]
+
+        events = merge_cl_events([d.enqueue_device_access(cl_environments, is_blocking=False, wait_for=wait_for)
+                                  for d in self._elements], cl_environments)
+        if is_blocking and events:
+            wait_for_cl_events(events)
         return events
 
     def get_kernel_inputs(self, cl_environment, workgroup_size):
@@ -1287,3 +1364,99 @@ class CompositeArray(KernelData):
     def get_nmr_kernel_inputs(self):
         return self._composite_array.get_nmr_kernel_inputs() + \
                sum(element.get_nmr_kernel_inputs() for element in self._elements)
+
+
+def _get_offset_arithmetic(data_length, nmr_elements):
+    """Get the CL expression for the offset of a problem instance into an array.
+
+    The problem id is a 64-bit integer, such that any buffer can be indexed. If the offsets of all problem instances
+    fit in 32 bits, as is the case for all arrays with less than 2^32 elements, we compute the offset using
+    32-bit integer arithmetic instead, which is faster on most devices.
+
+    Args:
+        data_length (int): the number of elements per problem instance
+        nmr_elements (int): the total number of elements in the array
+
+    Returns:
+        str: the offset expression, with a ``{problem_id}`` placeholder for the problem id
+    """
+    if nmr_elements < 2**32:
+        return str(data_length) + ' * (uint)({problem_id})'
+    return str(data_length) + ' * {problem_id}'
+
+
+def _get_copy_loop(ctype, nmr_elements, target, source, half_storage=None):
+    """Get the CL code for copying a fixed number of elements from the source to the target array.
+
+    If the number of elements allows it, this copies the data using the ``vload`` and ``vstore`` vector functions,
+    such that the data is moved in chunks of eight or four elements at once. Else, we copy the data element wise.
+    Since the number of iterations is known at code generation time, the loop is marked for unrolling.
+
+    Args:
+        ctype (str): the (scalar) ctype of the elements to copy
+        nmr_elements (int): the number of elements to copy
+        target (str): the address of the first element to copy to
+        source (str): the address of the first element to copy from
+        half_storage (str): if set, one of ``'source'`` or ``'target'`` to indicate which of the two is stored in
+            half precision. The elements are then converted using ``vload_half`` or ``vstore_half``.
+
+    Returns:
+        str: the CL code for the copy loop
+    """
+    if half_storage is None and ctype in _VECTOR_LOADABLE_CTYPES:
+        for vector_length in (8, 4):
+            if nmr_elements % vector_length == 0:
+                return '''
+                    #pragma unroll
+                    for(uint i = 0; i < {nmr_vectors}; i++){{
+                        vstore{n}(vload{n}(i, {source}), i, {target});
+                    }}
+                '''.format(nmr_vectors=nmr_elements // vector_length, n=vector_length,
+                           target=target, source=source)
+
+    copy_statement = '({target})[i] = ({source})[i];'
+    if half_storage == 'source':
+        copy_statement = '({target})[i] = vload_half(i, {source});'
+    elif half_storage == 'target':
+        copy_statement = 'vstore_half(({source})[i], i, {target});'
+
+    return '''
+        #pragma unroll
+        for(uint i = 0; i < {nmr_elements}; i++){{
+            {copy_statement}
+        }}
+    '''.format(nmr_elements=nmr_elements, copy_statement=copy_statement.format(target=target, source=source))
+
+
+def _get_work_group_copy(ctype, nmr_elements, target, source, half_storage=None):
+    """Get the CL code for copying a fixed number of elements between global and local memory.
+
+    For the builtin data types this uses ``async_work_group_copy``, which lets all work items of the work group
+    cooperate in the copy. For other data types, or for data stored in half precision, the first work item copies the
+    data element wise. In both cases the copy must be encountered by all work items in the work group and the data is
+    available to all work items afterwards.
+
+    Args:
+        ctype (str): the (scalar) ctype of the elements to copy
+        nmr_elements (int): the number of elements to copy
+        target (str): the address of the first element to copy to
+        source (str): the address of the first element to copy from
+        half_storage (str): if set, one of ``'source'`` or ``'target'``, see :func:`_get_copy_loop`.
+
+    Returns:
+        str: the CL code for the work group copy
+    """
+    if half_storage is None and ctype in _VECTOR_LOADABLE_CTYPES:
+        return '''
+            {{
+                event_t copy_event = async_work_group_copy({target}, {source}, {nmr_elements}, 0);
+                wait_group_events(1, &copy_event);
+            }}
+        '''.format(nmr_elements=nmr_elements, target=target, source=source)
+
+    return '''
+        if(get_local_id(0) == 0){{
+            {copy_loop}
+        }}
+        barrier(CLK_LOCAL_MEM_FENCE);
+    '''.format(copy_loop=_get_copy_loop(ctype, nmr_elements, target, source, half_storage=half_storage))
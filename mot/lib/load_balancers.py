@@ -63,3 +63,28 @@ class FractionalLoad(LoadBalancer):
 
         batches.append((offset, offset + elements_left))
         return batches
+
+
+class ComputeCapacityLoad(LoadBalancer):
+    """Balance the load according to the theoretical compute capacity of each device.
+
+    The compute capacity of a device is estimated as its number of compute units times its maximum clock frequency.
+    This is a rough estimate, but on heterogeneous systems (for example a CPU and a GPU, or GPU's of
+    different generations) it gives a more sensible division than an even distribution, without requiring
+    the user to specify the load fractions manually. Devices which do not report a clock frequency (a frequency of
+    zero) are assumed to run at the mean clock frequency of the devices that do. If no device reports a clock
+    frequency, the devices are weighted by their number of compute units only. Example:
+
+    .. code-block:: python
+
+        CLRuntimeInfo(cl_environments=[0, 1], load_balancer=ComputeCapacityLoad())
+    """
+
+    def get_division(self, cl_environments, nmr_instances):
+        known_frequencies = [env.device.max_clock_frequency for env in cl_environments
+                             if env.device.max_clock_frequency > 0]
+        default_frequency = np.mean(known_frequencies) if known_frequencies else 1
+
+        capacities = [env.device.max_compute_units * (env.device.max_clock_frequency or default_frequency)
+                      for env in cl_environments]
+        return FractionalLoad(capacities).get_division(cl_environments, nmr_instances)
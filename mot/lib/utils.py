@@ -3,14 +3,14 @@ import logging
 import multiprocessing
 import numbers
 import os
+import re
 from collections.abc import Iterable, Mapping
 from collections import OrderedDict
 from contextlib import contextmanager
-from functools import reduce
+from functools import lru_cache, reduce
 import numpy as np
 import pyopencl as cl
 import pyopencl.array as cl_array
-import tatsu
 from pkg_resources import resource_filename
 
 __author__ = 'Robbert Harms'
@@ -29,7 +29,8 @@ def convert_inputs_to_kernel_data(inputs, cl_parameters, nmr_instances):
             for each CL parameter matching input data. This function accepts either an iterable with one value
             per parameter, or a mapping with for every parameter a corresponding value. The elements can either
             be scalars, numpy ndarrays  or KernelData objects. If a scalar is given we load it as is. If an ndarray
-            is given we will load it read/write by default.
+            is given we will load it read/write by default, or read only if the parameter is read only
+            (see :attr:`~mot.lib.cl_function.CLFunctionParameter.is_read_only`).
         cl_parameters (List[mot.lib.cl_function.CLFunctionParameter]): list of function parameters corresponding to the
             function we plan on using the kernel data for.
         nmr_instances (int): the number of parallel processes supported by the data
@@ -64,23 +65,25 @@ def convert_inputs_to_kernel_data(inputs, cl_parameters, nmr_instances):
         elif isinstance(input_data, KernelData):
             return input_data
 
-        input_data = np.array(input_data)
-
-        if param.is_vector_type and np.squeeze(input_data).shape[0] == 3:
+        if param.is_vector_type and np.squeeze(np.asarray(input_data)).shape[0] == 3:
             return Scalar(inputs[param.name], ctype=param.ctype)
         elif is_scalar(inputs[param.name]) and not (param.is_pointer_type or param.is_array_type):
             return Scalar(inputs[param.name])
         else:
             if is_scalar(inputs[param.name]):
                 if param.is_pointer_type or param.is_array_type:
-                    data = np.ones(nmr_instances) * inputs[param.name]
-                    return Array(data, ctype=param.ctype, mode='rw')
+                    dtype = None
+                    if not param.is_vector_type:
+                        # the mot_float_type data is converted to the right precision later on
+                        dtype = ctype_to_dtype(param.ctype, 'double')
+                    data = np.full(nmr_instances, inputs[param.name], dtype=dtype)
+                    return Array(data, ctype=param.ctype, mode='r' if param.is_read_only else 'rw')
                 else:
                     return Scalar(inputs[param.name])
             else:
                 data = inputs[param.name]
                 if param.is_pointer_type or param.is_array_type:
-                    return Array(data, ctype=param.ctype, mode='rw')
+                    return Array(data, ctype=param.ctype, mode='r' if param.is_read_only else 'rw')
                 else:
                     return Array(data, ctype=param.ctype, mode='r', as_scalar=True)
 
@@ -160,6 +163,7 @@ def ctype_to_dtype(cl_type, mot_float_type='float'):
             ('uint', np.uint32),
             ('long', np.int64),
             ('ulong', np.uint64),
+            ('half', np.float16),
             ('float', np.float32),
             ('double', np.float64),
         ]
@@ -277,6 +281,8 @@ def device_supports_double(cl_device):
 def get_cl_utility_definitions(double_precision, include_complex=True):
     """Get the model floating point type definition.
 
+    Since this is included in every kernel, the result is cached for each combination of arguments.
+
     Args:
         double_precision (boolean): if True we will use the double type for the mot_float_type type.
             Else, we will use the single precision float type for the mot_float_type type.
@@ -361,6 +367,54 @@ def get_cl_utility_definitions(double_precision, include_complex=True):
         ''' + scipy_constants + complex_number_support + helper_funcs
 
 
+def merge_cl_events(event_dicts, cl_environments, previous_events=None):
+    """Merge the events of multiple independently enqueued operations into one event per environment.
+
+    Data transfers for the different kernel data elements do not depend on each other and can therefore all be
+    enqueued at once. This coalesces the resulting events, such that subsequent operations have to wait only on a
+    single event per environment. Since the events of the kernel data are stored per context, an environment
+    waits on all the events of its context.
+
+    Args:
+        event_dicts (List[Dict[CLEnvironment: cl.Event]]): the events generated by the separate operations
+        cl_environments (List[mot.lib.cl_environments.CLEnvironment]): the environments for which to merge the events
+        previous_events (Dict[CLEnvironment: cl.Event]): events the operations waited on. These are used for
+            the environments for which no new event was generated, such that the dependency chain is not broken.
+
+    Returns:
+        Dict[CLEnvironment: cl.Event]: per environment a single event signaling the completion of all operations
+    """
+    events = {}
+    for env in cl_environments:
+        wait_list = [event for event_dict in event_dicts
+                     for event_env, event in event_dict.items() if event_env.context is env.context]
+
+        if len(wait_list) == 1:
+            events[env] = wait_list[0]
+        elif len(wait_list) > 1:
+            events[env] = cl.enqueue_marker(env.queue, wait_for=wait_list)
+        elif previous_events and env in previous_events:
+            events[env] = previous_events[env]
+    return events
+
+
+def wait_for_cl_events(events):
+    """Block until all the given events are completed.
+
+    OpenCL can only wait at once on events of the same context. Since the environments may each have their own
+    context, we wait on the events grouped per context.
+
+    Args:
+        events (Dict[CLEnvironment: cl.Event]): the events to wait on, per environment
+    """
+    events_per_context = {}
+    for env, event in events.items():
+        events_per_context.setdefault(env.context, []).append(event)
+
+    for context_events in events_per_context.values():
+        cl.wait_for_events(context_events)
+
+
 def topological_sort(data):
     """Topological sort the given dictionary structure.
 
@@ -646,26 +700,67 @@ def multiprocess_mapping(func, iterable):
         return list(map(func, iterable))
 
 
-_tatsu_cl_function = '''
-    function = {documentation}* [kernel] [address_space] data_type function_name arglist body;
-    documentation = '/*' ->'*/';
-    kernel = ['__'] 'kernel';
-    address_space = ['__'] ('local' | 'global' | 'constant' | 'private');
-    data_type = /(\w+(\s*(\*)?)+)/;
-    function_name = /\w+/;
-    arglist = '(' @+:arg {',' @+:arg}* ')' | '()';
-    arg = /([\w \*\[\]]+)/;
-    body = compound_statement;
-    compound_statement = '{' {[/[^\{\}]*/] [compound_statement]}* '}';
-'''
+_cl_function_header = re.compile(r'''
+    (?P<kernel>(?:__)?kernel\s+)?
+    (?:(?P<address_space>(?:__)?(?:local|global|constant|private))\s+)?
+    (?P<return_type>\w+(?:\s+\w+)*?(?:\s*\*)*)\s*
+    (?P<function_name>\w+)\s*\(
+''', re.VERBOSE)
+_cl_comments_and_whitespace = re.compile(r'(?:\s+|/\*.*?\*/|//[^\n]*)*', re.DOTALL)
 
-_extract_cl_functions_parser = tatsu.compile('''
-    result = {function}+;
-''' + _tatsu_cl_function)
 
-_split_cl_function_parser = tatsu.compile('''
-    result = function;
-''' + _tatsu_cl_function)
+def _find_closing_bracket(cl_str, position, open_bracket='{', close_bracket='}'):
+    """Find the index of the bracket closing the bracket opened at the given position.
+
+    Args:
+        cl_str (str): the CL code to search
+        position (int): the index of the opening bracket
+        open_bracket (str): the opening bracket character
+        close_bracket (str): the closing bracket character
+
+    Returns:
+        int: the index of the matching closing bracket
+
+    Raises:
+        ValueError: if the brackets are not balanced
+    """
+    depth = 0
+    for ind in range(position, len(cl_str)):
+        if cl_str[ind] == open_bracket:
+            depth += 1
+        elif cl_str[ind] == close_bracket:
+            depth -= 1
+            if depth == 0:
+                return ind
+    raise ValueError('Unbalanced "{}{}" in the CL code.'.format(open_bracket, close_bracket))
+
+
+def _scan_cl_function(cl_str, position=0):
+    """Scan the CL function starting at the given position, skipping any preceding comments.
+
+    Args:
+        cl_str (str): the CL code to scan
+        position (int): the index from which to start scanning
+
+    Returns:
+        tuple: the regex match of the function header, the index of the parenthesis closing the argument list and
+            the start and end index of the function body (excluding the curly brackets).
+
+    Raises:
+        ValueError: if no CL function could be found at the given position
+    """
+    position = _cl_comments_and_whitespace.match(cl_str, position).end()
+    header = _cl_function_header.match(cl_str, position)
+    if header is None:
+        raise ValueError('Could not parse the CL function "{}".'.format(cl_str[position:position + 80]))
+
+    arglist_end = _find_closing_bracket(cl_str, header.end() - 1, '(', ')')
+    body_start = _cl_comments_and_whitespace.match(cl_str, arglist_end + 1).end()
+    if not cl_str.startswith('{', body_start):
+        raise ValueError('Missing the body of the CL function "{}".'.format(header.group('function_name')))
+
+    body_end = _find_closing_bracket(cl_str, body_start)
+    return header, arglist_end, body_start + 1, body_end
 
 
 def parse_cl_function(cl_code, dependencies=()):
@@ -694,33 +789,13 @@ def parse_cl_function(cl_code, dependencies=()):
         Returns:
             list: a list of strings, with one string per found CL function.
         """
-        class Semantics:
-
-            def __init__(self):
-                self._functions = []
-
-            def result(self, ast):
-                return self._functions
-
-            def arglist(self, ast):
-                if ast == '()':
-                    return '()'
-                return '({})'.format(', '.join(ast))
-
-            def function(self, ast):
-                def join(items):
-                    result = ''
-                    for item in items:
-                        if isinstance(item, str):
-                            result += item
-                        else:
-                            result += join(item)
-                    return result
-
-                self._functions.append(join(ast).strip())
-                return ast
-
-        return _extract_cl_functions_parser.parse(input_str, semantics=Semantics())
+        functions = []
+        position = 0
+        while input_str[position:].strip():
+            header, _, _, body_end = _scan_cl_function(input_str, position)
+            functions.append(input_str[header.start():body_end + 1])
+            position = body_end + 1
+        return functions
 
     functions = separate_cl_functions(cl_code)
     return SimpleCLFunction.from_string(functions[-1], dependencies=list(dependencies or []) + [
@@ -736,51 +811,15 @@ def split_cl_function(cl_str):
     Returns:
         tuple: string elements for the return type, function name, parameter list and the body
     """
-    class Semantics:
-
-        def __init__(self):
-            self._is_kernel_func = False
-            self._return_type = ''
-            self._function_name = ''
-            self._parameter_list = []
-            self._cl_body = ''
-
-        def result(self, ast):
-            return self._is_kernel_func, self._return_type, self._function_name, self._parameter_list, self._cl_body
-
-        def kernel(self, ast):
-            self._is_kernel_func = True
-            return ast
-
-        def address_space(self, ast):
-            self._return_type = ast.strip() + ' '
-            return ast
-
-        def data_type(self, ast):
-            self._return_type += ''.join(ast).strip()
-            return ast
-
-        def function_name(self, ast):
-            self._function_name = ast.strip()
-            return ast
-
-        def arglist(self, ast):
-            if ast != '()':
-                self._parameter_list = ast
-            return ast
-
-        def body(self, ast):
-            def join(items):
-                result = ''
-                for item in items:
-                    if isinstance(item, str):
-                        result += item
-                    else:
-                        result += join(item)
-                return result
-
-            self._cl_body = join(ast).strip()[1:-1]
-            return ast
-
-    return _split_cl_function_parser.parse(cl_str, semantics=Semantics())
+    header, arglist_end, body_start, body_end = _scan_cl_function(cl_str)
+
+    return_type = re.sub(r'\s+', ' ', header.group('return_type'))
+    if header.group('address_space'):
+        return_type = header.group('address_space') + ' ' + return_type
+
+    arglist = cl_str[header.end():arglist_end]
+    parameter_list = [arg.strip() for arg in arglist.split(',')] if arglist.strip() else []
+
+    return (header.group('kernel') is not None, return_type, header.group('function_name'),
+            parameter_list, cl_str[body_start:body_end])
 
@@ -106,36 +106,57 @@ def minimize(func, x0, data=None, method=None, lower_bounds=None, upper_bounds=N
     if len(x0.shape) < 2:
         x0 = x0[..., None]
 
-    lower_bounds = _bounds_to_array(lower_bounds or np.ones(x0.shape[1]) * -np.inf)
-    upper_bounds = _bounds_to_array(upper_bounds or np.ones(x0.shape[1]) * np.inf)
+    lower_bounds = lower_bounds or np.ones(x0.shape[1]) * -np.inf
+    upper_bounds = upper_bounds or np.ones(x0.shape[1]) * np.inf
+    bounded = _has_finite_bounds(lower_bounds, upper_bounds)
+
+    lower_bounds = _bounds_to_array(lower_bounds)
+    upper_bounds = _bounds_to_array(upper_bounds)
 
     if method == 'Powell':
         return _minimize_powell(func, x0, cl_runtime_info, lower_bounds, upper_bounds,
-                                use_local_reduction,
+                                use_local_reduction, bounded=bounded,
                                 constraints_func=constraints_func, data=data, options=options)
     elif method == 'Nelder-Mead':
         return _minimize_nmsimplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds,
-                                   use_local_reduction,
+                                   use_local_reduction, bounded=bounded,
                                    constraints_func=constraints_func, data=data, options=options)
     elif method == 'Levenberg-Marquardt':
         return _minimize_levenberg_marquardt(func, x0, nmr_observations, cl_runtime_info, lower_bounds, upper_bounds,
-                                             use_local_reduction,
+                                             use_local_reduction, bounded=bounded,
                                              constraints_func=constraints_func, data=data, options=options)
     elif method == 'Subplex':
         return _minimize_subplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds,
-                                 use_local_reduction,
+                                 use_local_reduction, bounded=bounded,
                                  constraints_func=constraints_func, data=data, options=options)
     raise ValueError('Could not find the specified method "{}".'.format(method))
 
 
+def _has_finite_bounds(lower_bounds, upper_bounds):
+    """Check if any of the given lower or upper bounds is finite.
+
+    Args:
+        lower_bounds (tuple): per parameter a scalar or vector lower bound
+        upper_bounds (tuple): per parameter a scalar or vector upper bound
+
+    Returns:
+        boolean: if any of the parameters is bounded
+    """
+    return any(np.any(np.isfinite(value)) for value in list(lower_bounds) + list(upper_bounds))
+
+
 def _bounds_to_array(bounds):
-    """Create a CompositeArray to hold the bounds."""
-    elements = []
-    for value in bounds:
-        if all_elements_equal(value):
-            elements.append(Scalar(get_single_value(value), ctype='mot_float_type'))
-        else:
-            elements.append(Array(value, ctype='mot_float_type', as_scalar=True))
+    """Create a CompositeArray to hold the bounds.
+
+    If all the bounds are scalars they are loaded as kernel arguments. Else, all the bounds are packed into a single
+    (n, p) matrix such that they are transferred to the device as one buffer, instead of one buffer per parameter.
+    """
+    if all(all_elements_equal(value) for value in bounds):
+        elements = [Scalar(get_single_value(value), ctype='mot_float_type') for value in bounds]
+    else:
+        nmr_problems = max(np.size(value) for value in bounds)
+        packed = np.stack([np.broadcast_to(np.squeeze(value), (nmr_problems,)) for value in bounds], axis=1)
+        elements = [Array(packed, ctype='mot_float_type', mode='r')]
     return CompositeArray(elements, 'mot_float_type', address_space='local')
 
 
@@ -245,7 +266,7 @@ def _clean_options(method, provided_options):
 
 
 def _minimize_powell(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use_local_reduction,
-                     constraints_func=None, data=None, options=None):
+                     bounded=True, constraints_func=None, data=None, options=None):
     """
     Options:
         patience (int): Used to set the maximum number of iterations to patience*(number_of_parameters+1)
@@ -257,7 +278,7 @@ def _minimize_powell(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use_
     nmr_problems = x0.shape[0]
     nmr_parameters = x0.shape[1]
 
-    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func)
+    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func, bounded=bounded)
 
     eval_func = SimpleCLFunction.from_string('''
         double evaluate(local mot_float_type* x, void* data){
@@ -299,7 +320,7 @@ def _minimize_powell(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use_
 
 
 def _minimize_nmsimplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use_local_reduction,
-                        constraints_func=None, data=None, options=None):
+                        bounded=True, constraints_func=None, data=None, options=None):
     """Use the Nelder-Mead simplex method to calculate the optimimum.
 
     The scales should satisfy the following constraints:
@@ -341,7 +362,7 @@ def _minimize_nmsimplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, u
     nmr_problems = x0.shape[0]
     nmr_parameters = x0.shape[1]
 
-    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func)
+    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func, bounded=bounded)
 
     eval_func = SimpleCLFunction.from_string('''
         double evaluate(local mot_float_type* x, void* data){
@@ -384,7 +405,7 @@ def _minimize_nmsimplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, u
 
 
 def _minimize_subplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use_local_reduction,
-                      constraints_func=None, data=None, options=None):
+                      bounded=True, constraints_func=None, data=None, options=None):
     """Variation on the Nelder-Mead Simplex method by Thomas H. Rowan.
 
     This method uses NMSimplex to search subspace regions for the minimum. See Rowan's thesis titled
@@ -436,7 +457,7 @@ def _minimize_subplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use
     nmr_problems = x0.shape[0]
     nmr_parameters = x0.shape[1]
 
-    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func)
+    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func, bounded=bounded)
 
     eval_func = SimpleCLFunction.from_string('''
         double evaluate(local mot_float_type* x, void* data){
@@ -479,7 +500,7 @@ def _minimize_subplex(func, x0, cl_runtime_info, lower_bounds, upper_bounds, use
 
 def _minimize_levenberg_marquardt(func, x0, nmr_observations, cl_runtime_info, lower_bounds, upper_bounds,
                                   use_local_reduction,
-                                  constraints_func=None, data=None, options=None):
+                                  bounded=True, constraints_func=None, data=None, options=None):
     options = options or {}
     nmr_problems = x0.shape[0]
     nmr_parameters = x0.shape[1]
@@ -487,7 +508,7 @@ def _minimize_levenberg_marquardt(func, x0, nmr_observations, cl_runtime_info, l
     if nmr_observations < x0.shape[1]:
         raise ValueError('The number of instances per problem must be greater than the number of parameters')
 
-    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func)
+    penalty_data, penalty_func = _get_penalty_function(nmr_parameters, constraints_func, bounded=bounded)
 
     eval_func = SimpleCLFunction.from_string('''
         void evaluate(local mot_float_type* x, void* data, local mot_float_type* result){
@@ -724,7 +745,7 @@ def _lm_numdiff_jacobian(eval_func, nmr_params, nmr_observations):
     ''')])
 
 
-def _get_penalty_function(nmr_parameters, constraints_func=None):
+def _get_penalty_function(nmr_parameters, constraints_func=None, bounded=True):
     """Get a function to compute the penalty term for the boundary conditions.
 
     This is meant to be used in the evaluation function of the optimization routines.
@@ -748,6 +769,8 @@ def _get_penalty_function(nmr_parameters, constraints_func=None):
 
             That is, for each constraint function :math:`g_i`, formulated as :math:`g_i(x) <= 0`, we should return
             the function value of :math:`g_i`.
+        bounded (boolean): if any of the parameters has a finite lower or upper bound. If not, and if there are
+            no constraints, the penalty is always zero and we return a function which does not compute anything.
 
     Returns:
         tuple: Struct and SimpleCLFunction, the required data for the penalty function and the penalty function itself.
@@ -772,6 +795,21 @@ def _get_penalty_function(nmr_parameters, constraints_func=None):
         '''
 
     data = Struct(data_requirements, '_mle_penalty_data')
+
+    if not bounded and not constraints_code:
+        func = SimpleCLFunction.from_string('''
+            double _mle_penalty(
+                    local mot_float_type* x,
+                    void* data,
+                    local mot_float_type* lower_bounds,
+                    local mot_float_type* upper_bounds,
+                    float penalty_weight,
+                    void* scratch_data){
+                return 0;
+            }
+        ''')
+        return data, func
+
     func = SimpleCLFunction.from_string('''
         double _mle_penalty(
                 local mot_float_type* x,
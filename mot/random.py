@@ -61,9 +61,9 @@ def uniform(nmr_distributions, nmr_samples, low=0, high=1, ctype='float', seed=N
             rand123_data rand123_rng_data = rand123_initialize_from_seed(rng_seed);
             void* rng_data = (void*)&rand123_rng_data;
 
-            for(uint i = 0; i < ''' + str(nmr_samples) + '''; i++){
-                double4 randomnr = rand4(rng_data);
-                samples[i] = (''' + ctype + ''')(low + randomnr.x * (high - low));
+            for(uint i = 0; i < ''' + str(nmr_samples) + '''; i += 4){
+                double4 randomnr = low + rand4(rng_data) * (high - low);
+                ''' + _store_vector_samples('randomnr', nmr_samples, ctype) + '''
             }
         }
     ''', dependencies=[Rand123()])
@@ -98,9 +98,9 @@ def normal(nmr_distributions, nmr_samples, mean=0, std=1, ctype='float', seed=No
             rand123_data rand123_rng_data = rand123_initialize_from_seed(rng_seed);
             void* rng_data = (void*)&rand123_rng_data;
 
-            for(uint i = 0; i < ''' + str(nmr_samples) + '''; i++){
-                double4 randomnr = randn4(rng_data);
-                samples[i] = (''' + ctype + ''')(mean + randomnr.x * std);
+            for(uint i = 0; i < ''' + str(nmr_samples) + '''; i += 4){
+                double4 randomnr = mean + randn4(rng_data) * std;
+                ''' + _store_vector_samples('randomnr', nmr_samples, ctype) + '''
             }
         }
     ''', dependencies=[Rand123()])
@@ -108,12 +108,34 @@ def normal(nmr_distributions, nmr_samples, mean=0, std=1, ctype='float', seed=No
     return _generate_samples(kernel, nmr_distributions, nmr_samples, ctype, kernel_data, seed=seed)
 
 
+def _store_vector_samples(vector_name, nmr_samples, ctype):
+    """Get the CL code for storing the four elements of a random vector in the samples array.
+
+    The random number generator generates four random numbers at once. Instead of discarding three of them,
+    we store all four, guarding for the last iteration if the number of samples is not a multiple of four.
+
+    Args:
+        vector_name (str): the name of the ``double4`` vector with the random numbers
+        nmr_samples (int): the total number of samples
+        ctype (str): the C type of the output samples
+
+    Returns:
+        str: the CL code for storing the samples at index ``i`` to ``i + 3``.
+    """
+    return '''
+        samples[i] = ({ctype}){v}.x;
+        if(i + 1 < {n}){{ samples[i + 1] = ({ctype}){v}.y; }}
+        if(i + 2 < {n}){{ samples[i + 2] = ({ctype}){v}.z; }}
+        if(i + 3 < {n}){{ samples[i + 3] = ({ctype}){v}.w; }}
+    '''.format(v=vector_name, n=nmr_samples, ctype=ctype)
+
+
 def _generate_samples(cl_function, nmr_distributions, nmr_samples, ctype, kernel_data, seed=None):
     np.random.seed(seed)
     rng_seed = np.random.uniform(low=np.iinfo(np.uint32).min, high=np.iinfo(np.uint32).max + 1,
                                  size=(nmr_distributions, 1)).astype(np.uint32)
 
-    kernel_data.update({'samples': Zeros((nmr_distributions, nmr_samples), ctype),
+    kernel_data.update({'samples': Zeros((nmr_distributions, nmr_samples), ctype, mode='w'),
                         'rng_seed': Array(rng_seed, 'uint', mode='r', as_scalar=True)})
 
     cl_function.evaluate(kernel_data, nmr_distributions)
@@ -135,6 +135,8 @@ class AbstractSampler:
                 outputs = []
                 for batch_start, batch_end in split_in_batches(nmr_samples, max_batch_size=max_samples_per_batch):
                     outputs.append(self._sample(batch_end - batch_start, thinning=thinning))
+                if len(outputs) == 1:
+                    return SimpleSampleOutput(*outputs[0])
                 return SimpleSampleOutput(*[np.concatenate([o[ind] for o in outputs], axis=-1) for ind in range(3)])
 
     def _sample(self, nmr_samples, thinning=1, return_output=True):
@@ -191,9 +193,9 @@ class AbstractSampler:
         ''', dependencies=[self._get_log_prior_cl_func(), self._get_log_likelihood_cl_func()])
 
         kernel_data = {
-            'chain_position': Array(positions, 'mot_float_type', mode='rw'),
-            'log_likelihood': Array(log_likelihoods, 'mot_float_type', mode='rw'),
-            'log_prior': Array(log_priors, 'mot_float_type', mode='rw'),
+            'chain_position': Array(positions, 'mot_float_type', mode='r'),
+            'log_likelihood': Array(log_likelihoods, 'mot_float_type', mode='w'),
+            'log_prior': Array(log_priors, 'mot_float_type', mode='w'),
             'x_tmp': LocalMemory('mot_float_type', self._nmr_params),
             'data': self._data
         }
@@ -243,9 +245,10 @@ class AbstractSampler:
 
         if return_output:
             kernel_data.update({
-                'samples': Zeros((self._nmr_problems, self._nmr_params, nmr_samples), ctype='mot_float_type'),
-                'log_likelihoods': Zeros((self._nmr_problems, nmr_samples), ctype='mot_float_type'),
-                'log_priors': Zeros((self._nmr_problems, nmr_samples), ctype='mot_float_type'),
+                'samples': Zeros((self._nmr_problems, self._nmr_params, nmr_samples), ctype='mot_float_type',
+                                 mode='w'),
+                'log_likelihoods': Zeros((self._nmr_problems, nmr_samples), ctype='mot_float_type', mode='w'),
+                'log_priors': Zeros((self._nmr_problems, nmr_samples), ctype='mot_float_type', mode='w'),
             })
         return kernel_data
 
@@ -514,8 +517,11 @@ class AbstractRWMSampler(AbstractSampler):
                         new_log_likelihood = _computeLogLikelihood(new_position, data);
 
                         if(is_first_work_item){
-                            if(frand(rng_data) < exp((new_log_likelihood + *new_log_prior)
-                                                     - (*current_log_likelihood + *current_log_prior))){
+                            double log_acceptance_ratio = (new_log_likelihood + *new_log_prior)
+                                                          - (*current_log_likelihood + *current_log_prior);
+
+                            // proposals that increase the posterior are always accepted, no need for a random draw
+                            if(log_acceptance_ratio >= 0 || frand(rng_data) < exp(log_acceptance_ratio)){
                                 *current_log_likelihood = new_log_likelihood;
                                 *current_log_prior = *new_log_prior;
                                 for(uint k = 0; k < ''' + str(self._nmr_params) + '''; k++){
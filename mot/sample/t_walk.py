@@ -288,8 +288,9 @@ class ThoughtfulWalk(AbstractSampler):
                     *proposal_ll = _computeLogLikelihood(proposal, data);
 
                     if(is_first_work_item){
-                        *proposal_accepted = frand(rng_data) < exp((*proposal_ll + *proposal_lprior)
-                                                                   - (*main_ll + *main_lprior));
+                        double log_acceptance_ratio = (*proposal_ll + *proposal_lprior)
+                                                      - (*main_ll + *main_lprior);
+                        *proposal_accepted = log_acceptance_ratio >= 0 || frand(rng_data) < exp(log_acceptance_ratio);
                     }
                 }
                 barrier(CLK_LOCAL_MEM_FENCE);
@@ -361,9 +362,11 @@ class ThoughtfulWalk(AbstractSampler):
                             *proposal_accepted = true;
                         }
                         else{
-                            *proposal_accepted = frand(rng_data) < exp((*proposal_ll + *proposal_lprior)
-                                                                       - (*main_ll + *main_lprior)
-                                                                       + (nmr_params_selected - 2) * log(beta));
+                            double log_acceptance_ratio = (*proposal_ll + *proposal_lprior)
+                                                          - (*main_ll + *main_lprior)
+                                                          + (nmr_params_selected - 2) * log(beta);
+                            *proposal_accepted = log_acceptance_ratio >= 0
+                                                 || frand(rng_data) < exp(log_acceptance_ratio);
                         }
                     }
                 }
@@ -478,9 +481,10 @@ class ThoughtfulWalk(AbstractSampler):
                         float g_yx = _hop_move_hasting_criteria_yx(proposal, main_chain, helper_chain,
                                                                    params_selector, nmr_params_selected);
 
-                        *proposal_accepted = frand(rng_data) < exp((*proposal_ll + *proposal_lprior)
-                                                                       - (*main_ll + *main_lprior)
-                                                                       + (g_xy - g_yx));
+                        double log_acceptance_ratio = (*proposal_ll + *proposal_lprior)
+                                                      - (*main_ll + *main_lprior)
+                                                      + (g_xy - g_yx);
+                        *proposal_accepted = log_acceptance_ratio >= 0 || frand(rng_data) < exp(log_acceptance_ratio);
                     }
                 }
                 barrier(CLK_LOCAL_MEM_FENCE);
@@ -588,9 +592,10 @@ class ThoughtfulWalk(AbstractSampler):
                         float g_yx = _blow_move_hasting_criteria_yx(proposal, main_chain, helper_chain,
                                                                     params_selector, nmr_params_selected);
 
-                        *proposal_accepted = frand(rng_data) < exp((*proposal_ll + *proposal_lprior)
-                                                                       - (*main_ll + *main_lprior)
-                                                                       + (g_xy - g_yx));
+                        double log_acceptance_ratio = (*proposal_ll + *proposal_lprior)
+                                                      - (*main_ll + *main_lprior)
+                                                      + (g_xy - g_yx);
+                        *proposal_accepted = log_acceptance_ratio >= 0 || frand(rng_data) < exp(log_acceptance_ratio);
                     }
                 }
                 barrier(CLK_LOCAL_MEM_FENCE);
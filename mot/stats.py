@@ -1,8 +1,6 @@
 import numpy as np
-import scipy
 from scipy.optimize import minimize
 from scipy.stats import norm
-import scipy.integrate
 
 from mot.lib.cl_function import SimpleCLFunction
 from mot.lib.kernel_data import Array, Zeros, Scalar
@@ -137,7 +135,8 @@ def gaussian_overlapping_coefficient(means_0, stds_0, means_1, stds_1, lower=Non
     :math:`f \sim \mathcal{N}(\mu_0, \sigma_0^{2})` and :math:`f \sim \mathcal{N}(\mu_1, \sigma_1^{2})` are normally
     distributed variables.
 
-    This will compute the overlap for each element in the first dimension.
+    This will compute the overlap for each element in the first dimension. The integral is evaluated in closed form
+    using the normal CDF between the crossing points of the two densities.
 
     Args:
         means_0 (ndarray): the set of means of the first distribution
@@ -152,11 +151,47 @@ def gaussian_overlapping_coefficient(means_0, stds_0, means_1, stds_1, lower=Non
     if upper is None:
         upper = np.inf
 
-    def point_iterator():
-        for ind in range(means_0.shape[0]):
-            yield np.squeeze(means_0[ind]), np.squeeze(stds_0[ind]), np.squeeze(means_1[ind]), np.squeeze(stds_1[ind])
+    m0, s0, m1, s1 = (np.reshape(v, means_0.shape[0]).astype(np.float64) for v in (means_0, stds_0, means_1, stds_1))
 
-    return np.array(list(multiprocess_mapping(_ComputeGaussianOverlap(lower, upper), point_iterator())))
+    # the crossings of the two densities, roots of a x^2 + b x + c = 0 found by equating the log densities
+    a = 1 / (2 * s1 ** 2) - 1 / (2 * s0 ** 2)
+    b = m0 / s0 ** 2 - m1 / s1 ** 2
+    c = m1 ** 2 / (2 * s1 ** 2) - m0 ** 2 / (2 * s0 ** 2) + np.log(s1 / s0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # solved in the cancellation free form, using q = -(b + sign(b) sqrt(b^2 - 4ac)) / 2 with roots q / a and c / q
+        q = -(b + np.where(b < 0, -1, 1) * np.sqrt(np.maximum(b ** 2 - 4 * a * c, 0))) / 2
+        quadratic = a != 0
+        crossings = np.stack([
+            np.where(quadratic, q / a, np.where(b != 0, -c / b, np.nan)),
+            np.where(quadratic & (q != 0), c / q, np.nan)], axis=1)
+
+    # between two consecutive breakpoints the minimum of the two densities is a single one of the densities
+    breakpoints = np.concatenate([np.full((len(m0), 1), lower), crossings, np.full((len(m0), 1), upper)], axis=1)
+    breakpoints = np.sort(np.clip(np.where(np.isnan(breakpoints), lower, breakpoints), lower, upper), axis=1)
+
+    overlap = np.zeros(len(m0))
+    for left, right in zip(breakpoints[:, :-1].T, breakpoints[:, 1:].T):
+        with np.errstate(invalid='ignore'):
+            probe = np.where(np.isfinite(left),
+                             np.where(np.isfinite(right), (left + right) / 2, left + 1),
+                             np.where(np.isfinite(right), right - 1, 0))
+
+        # compared in log space since far from the means both densities underflow to zero
+        use_first = norm.logpdf(probe, m0, s0) <= norm.logpdf(probe, m1, s1)
+        overlap += np.where(use_first, _normal_mass(left, right, m0, s0), _normal_mass(left, right, m1, s1))
+    return overlap
+
+
+def _normal_mass(lower, upper, mean, std):
+    """Get the probability mass of the normal distribution between the lower and upper limit.
+
+    Above the mean this uses the survival function to avoid the loss of precision in subtracting two CDF values
+    close to one.
+    """
+    return np.where(lower > mean,
+                    norm.sf(lower, mean, std) - norm.sf(upper, mean, std),
+                    norm.cdf(upper, mean, std) - norm.cdf(lower, mean, std))
 
 
 def deviance_information_criterions(mean_posterior_lls, ll_per_sample):
@@ -239,34 +274,6 @@ def deviance_information_criterions(mean_posterior_lls, ll_per_sample):
             'DIC_Ando_2011': np.nan_to_num(mean_deviance + 2 * pd_2002)}
 
 
-class _ComputeGaussianOverlap:
-
-    def __init__(self, lower, upper):
-        """Helper routine for :func:`gaussian_overlapping_coefficient`.
-
-        This calculates the overlap between two Normal distribution by taking the integral from lower to upper
-        over min(f, g).
-        """
-        self.lower = lower
-        self.upper = upper
-
-    def __call__(self, data):
-        """Compute the overlap.
-
-        This expects data to be a tuple consisting of :math:`\mu_0, \sigma_0, \mu_1, \sigma_1`.
-
-        Returns:
-            float: the overlap between the two Gaussians.
-        """
-        m0, std0, m1, std1 = data
-
-        def overlap_func(x):
-            fx = norm.pdf(x, m0, std0)
-            gx = norm.pdf(x, m1, std1)
-            return min(fx, gx)
-        return scipy.integrate.quad(overlap_func, self.lower, self.upper)[0]
-
-
 class _TruncatedNormalFitter:
 
     def __call__(self, item):
@@ -10,9 +10,13 @@ Tests for `mot` module.
 
 import unittest
 import numpy as np
+import pyopencl as cl
 
 from mot import minimize
-from mot.lib.cl_function import SimpleCLFunction
+from mot.configuration import CLRuntimeInfo
+from mot.lib.cl_function import SimpleCLFunction, BatchedEvaluator
+from mot.lib.cl_environments import CLEnvironment
+from mot.lib.kernel_data import Array
 
 
 class CLRoutineTestCase(unittest.TestCase):
@@ -90,5 +94,210 @@ class TestLSQNonLinExample(CLRoutineTestCase):
                 self.assertAlmostEqual(v[0, ind], 0.2578, places=3, msg=method)
 
 
+class TestPerProblemBounds(CLRoutineTestCase):
+
+    def test_model(self):
+        objective_func = SimpleCLFunction.from_string('''
+            double bounded_quadratic(local const mot_float_type* const x, void* data,
+                                     local mot_float_type* objective_list){
+                return pown(x[0] - 5, 2) + pown(x[1], 2);
+            }
+        ''')
+        upper_bounds = np.linspace(1, 3, 4)
+        output = minimize(objective_func, np.tile([0, 2], (4, 1)), method='Subplex',
+                          lower_bounds=(-np.inf, 1), upper_bounds=(upper_bounds, 3))
+        v = output['x']
+        for ind in range(4):
+            self.assertAlmostEqual(v[ind, 0], upper_bounds[ind], places=2)
+            self.assertAlmostEqual(v[ind, 1], 1, places=2)
+
+
+class TestLocalSize(CLRoutineTestCase):
+
+    def test_local_size_capped(self):
+        """A local size larger than the devices support is capped instead of failing."""
+        func = SimpleCLFunction.from_string('''
+            void store_local_size(global uint* local_size){
+                if(get_local_id(0) == 0){
+                    *local_size = get_local_size(0);
+                }
+            }
+        ''')
+        local_sizes = np.zeros(2, dtype=np.uint32)
+        func.evaluate({'local_size': local_sizes}, 2, use_local_reduction=True, local_size=2 ** 20)
+        self.assertTrue(np.all(local_sizes > 0))
+        self.assertTrue(np.all(local_sizes < 2 ** 20))
+
+
+class TestBatchedEvaluator(CLRoutineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._function = SimpleCLFunction.from_string('''
+            double scaled_sum(global mot_float_type* x, double scale, double* sum){
+                *sum = (x[0] + x[1]) * scale;
+                return *sum + 1;
+            }
+        ''')
+
+    def test_batched_evaluation(self):
+        evaluator = BatchedEvaluator(self._function)
+        submissions = [(np.arange(6, dtype=np.float64).reshape(3, 2), 2, np.zeros(3)),
+                       (np.ones((2, 2)), 3, np.zeros(2))]
+        futures = [evaluator.submit({'x': x, 'scale': scale, 'sum': sums}, x.shape[0])
+                   for x, scale, sums in submissions]
+        self.assertFalse(any(future.done() for future in futures))
+
+        evaluator.flush()
+
+        for future, (x, scale, sums) in zip(futures, submissions):
+            expected = (x[:, 0] + x[:, 1]) * scale
+            np.testing.assert_allclose(sums, expected)
+            np.testing.assert_allclose(future.result(), expected + 1)
+
+    def test_auto_flush(self):
+        evaluator = BatchedEvaluator(self._function, max_batch_size=4)
+        first = evaluator.submit([np.ones((2, 2)), 1, np.zeros(2)], 2)
+        self.assertFalse(first.done())
+        second = evaluator.submit([np.ones((2, 2)), 1, np.zeros(2)], 2)
+        self.assertTrue(first.done() and second.done())
+        np.testing.assert_allclose(second.result(), [3, 3])
+
+    def test_invalid_input(self):
+        evaluator = BatchedEvaluator(self._function)
+        self.assertRaises(ValueError, evaluator.submit, [np.ones((3, 2)), 1, np.zeros(3)], 2)
+
+    def test_scalar_expansion(self):
+        evaluator = BatchedEvaluator(self._function)
+        first = evaluator.submit([np.ones((2, 2)), 1, np.zeros(2)], 2)
+        second = evaluator.submit([2, 1, np.zeros(3)], 3)
+        evaluator.flush()
+        np.testing.assert_allclose(first.result(), [3, 3])
+        np.testing.assert_allclose(second.result(), [5, 5, 5])
+
+    def test_failed_flush(self):
+        evaluator = BatchedEvaluator(self._function)
+        futures = [evaluator.submit([np.ones((2, 2)), 1, np.zeros(2)], 2),
+                   evaluator.submit([np.ones((2, 3)), 1, np.zeros(2)], 2)]
+        self.assertRaises(ValueError, evaluator.flush)
+        for future in futures:
+            self.assertIsInstance(future.exception(timeout=0), ValueError)
+
+
+class TestSimpleCLFunctionEquality(CLRoutineTestCase):
+
+    def test_structural_equality(self):
+        first = SimpleCLFunction.from_string('double f(global double* x){ return x[0]; }')
+        same = SimpleCLFunction.from_string('double f(global double* x){ return x[0]; }')
+        other = SimpleCLFunction.from_string('double f(global double* x){ return x[1]; }')
+
+        self.assertEqual(first, same)
+        self.assertEqual(hash(first), hash(same))
+        self.assertNotEqual(first, other)
+        self.assertEqual(len({first, same, other}), 2)
+
+
+class TestHalfStorage(CLRoutineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._data = np.arange(8, dtype=np.float64).reshape(4, 2) + 0.5
+
+    def test_private_and_local(self):
+        func = SimpleCLFunction.from_string('''
+            double sum_elements(private float* x, local float* y){
+                return x[0] + x[1] + y[0] + y[1];
+            }
+        ''')
+        return_values = func.evaluate({'x': Array(self._data, 'float', mode='r', half_storage=True),
+                                       'y': Array(self._data, 'float', mode='r', half_storage=True)}, 4)
+        np.testing.assert_allclose(return_values, 2 * self._data.sum(axis=1))
+
+    def test_as_scalar(self):
+        func = SimpleCLFunction.from_string('''
+            double times_two(float x){
+                return 2 * x;
+            }
+        ''')
+        return_values = func.evaluate({'x': Array(self._data[:, 0], 'float', mode='r', as_scalar=True,
+                                                  half_storage=True)}, 4)
+        np.testing.assert_allclose(return_values, 2 * self._data[:, 0])
+
+    def test_write_back(self):
+        func = SimpleCLFunction.from_string('''
+            void double_elements(private float* x, local float* y){
+                x[0] *= 2;
+                x[1] *= 2;
+                if(get_local_id(0) == 0){
+                    y[0] *= 2;
+                    y[1] *= 2;
+                }
+            }
+        ''')
+        private_data = Array(self._data, 'float', mode='rw', half_storage=True)
+        local_data = Array(self._data, 'float', mode='rw', half_storage=True)
+        func.evaluate({'x': private_data, 'y': local_data}, 4)
+
+        for kernel_data in (private_data, local_data):
+            self.assertEqual(kernel_data.get_data().dtype, np.float16)
+            np.testing.assert_allclose(kernel_data.get_data(), 2 * self._data)
+
+    def test_global_pointer(self):
+        func = SimpleCLFunction.from_string('''
+            double first_element(global float* x){
+                return x[0];
+            }
+        ''')
+        self.assertRaises(ValueError, func.evaluate, {'x': Array(self._data, 'float', half_storage=True)}, 4)
+
+
+class TestMotFloatTypeConversion(CLRoutineTestCase):
+
+    def test_modified_source_data(self):
+        func = SimpleCLFunction.from_string('''
+            double first_element(global mot_float_type* x){
+                return x[0];
+            }
+        ''')
+        data = np.arange(8, dtype=np.float64).reshape(4, 2)
+        kernel_data = Array(data, 'mot_float_type', mode='r')
+        cl_runtime_info = CLRuntimeInfo(double_precision=False)
+
+        np.testing.assert_allclose(func.evaluate({'x': kernel_data}, 4, cl_runtime_info=cl_runtime_info), data[:, 0])
+        data += 1
+        np.testing.assert_allclose(func.evaluate({'x': kernel_data}, 4, cl_runtime_info=cl_runtime_info), data[:, 0])
+
+
+class TestMultipleContexts(CLRoutineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        platform = cl.get_platforms()[0]
+        device = platform.get_devices()[0]
+        self._cl_environments = [CLEnvironment(platform, cl.Context([device]), device) for _ in range(2)]
+
+    def test_blocking_transfers(self):
+        data = np.arange(6, dtype=np.float64).reshape(3, 2)
+        kernel_data = Array(data, 'double', use_host_ptr=False)
+        kernel_data.enqueue_device_access(self._cl_environments, is_blocking=True)
+        kernel_data.enqueue_host_access(self._cl_environments, is_blocking=True)
+        np.testing.assert_allclose(kernel_data.get_data(), data)
+
+    def test_evaluate(self):
+        func = SimpleCLFunction.from_string('''
+            double increment_first(global double* x){
+                x[0] += 1;
+                return x[0] + x[1];
+            }
+        ''')
+        data = np.arange(8, dtype=np.float64).reshape(4, 2)
+        expected = data.copy()
+        expected[:, 0] += 1
+
+        return_values = func.evaluate({'x': data}, 4, cl_runtime_info=CLRuntimeInfo(self._cl_environments))
+        np.testing.assert_allclose(data, expected)
+        np.testing.assert_allclose(return_values, expected.sum(axis=1))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_load_balancers
+----------------------------------
+
+Tests for the `mot.lib.load_balancers` module.
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from mot.lib.load_balancers import ComputeCapacityLoad
+
+
+def _stub_environment(max_compute_units, max_clock_frequency):
+    """Create a stand-in for a CLEnvironment with only the device properties used by the load balancer."""
+    return SimpleNamespace(device=SimpleNamespace(max_compute_units=max_compute_units,
+                                                  max_clock_frequency=max_clock_frequency))
+
+
+class TestComputeCapacityLoad(unittest.TestCase):
+
+    def test_division(self):
+        environments = [_stub_environment(8, 1000), _stub_environment(2, 1000)]
+        self.assertEqual(ComputeCapacityLoad().get_division(environments, 100), [(0, 80), (80, 100)])
+
+    def test_clock_frequency(self):
+        environments = [_stub_environment(4, 500), _stub_environment(4, 1500)]
+        self.assertEqual(ComputeCapacityLoad().get_division(environments, 100), [(0, 25), (25, 100)])
+
+    def test_unknown_clock_frequency(self):
+        environments = [_stub_environment(4, 0), _stub_environment(12, 0)]
+        self.assertEqual(ComputeCapacityLoad().get_division(environments, 100), [(0, 25), (25, 100)])
+
+        environments = [_stub_environment(4, 0), _stub_environment(4, 1000)]
+        self.assertEqual(ComputeCapacityLoad().get_division(environments, 100), [(0, 50), (50, 100)])
+
+        environments = [_stub_environment(4, 0), _stub_environment(2, 1000), _stub_environment(4, 500)]
+        self.assertEqual(ComputeCapacityLoad().get_division(environments, 70), [(0, 30), (30, 50), (50, 70)])
+
+    def test_single_device(self):
+        self.assertEqual(ComputeCapacityLoad().get_division([_stub_environment(4, 1000)], 10), [(0, 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_stats
+----------------------------------
+
+Tests for the `mot.stats` module.
+"""
+
+import unittest
+import numpy as np
+from scipy.integrate import quad
+from scipy.stats import norm
+
+from mot.stats import gaussian_overlapping_coefficient
+
+
+class TestGaussianOverlappingCoefficient(unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        random_state = np.random.RandomState(0)
+        nmr_cases = 50
+        self.means_0 = random_state.normal(size=nmr_cases)
+        self.stds_0 = random_state.uniform(0.1, 3, nmr_cases)
+        self.means_1 = random_state.normal(size=nmr_cases)
+        self.stds_1 = random_state.uniform(0.1, 3, nmr_cases)
+
+        # standard deviations with a ratio close to one, and an identical pair of distributions
+        self.stds_1[:10] = self.stds_0[:10] * (1 + np.linspace(-0.02, 0.02, 10))
+        self.stds_1[10:15] = self.stds_0[10:15]
+        self.means_1[15], self.stds_1[15] = self.means_0[15], self.stds_0[15]
+
+        self.means_0 = np.append(self.means_0, 0)
+        self.stds_0 = np.append(self.stds_0, 1)
+        self.means_1 = np.append(self.means_1, 1.5)
+        self.stds_1 = np.append(self.stds_1, 1.01)
+
+    def test_against_numerical_integration(self):
+        for lower, upper in ((None, None), (-0.5, 1.0), (0, None)):
+            overlap = gaussian_overlapping_coefficient(self.means_0, self.stds_0, self.means_1, self.stds_1,
+                                                       lower=lower, upper=upper)
+
+            for ind in range(len(self.means_0)):
+                expected = self._integrate(self.means_0[ind], self.stds_0[ind], self.means_1[ind], self.stds_1[ind],
+                                           -np.inf if lower is None else lower, np.inf if upper is None else upper)
+                self.assertAlmostEqual(overlap[ind], expected, places=5, msg=(lower, upper, ind))
+
+    @staticmethod
+    def _integrate(m0, s0, m1, s1, lower, upper):
+        def overlap_func(x):
+            return min(norm.pdf(x, m0, s0), norm.pdf(x, m1, s1))
+
+        # the kink points of the integrand, to let quad resolve them properly
+        points = [m0, m1, (m0 + m1) / 2]
+        if np.isfinite(lower) and np.isfinite(upper):
+            return quad(overlap_func, lower, upper, points=[p for p in points if lower < p < upper], limit=200)[0]
+
+        middle = np.clip(np.mean(points), lower, upper)
+        return (quad(overlap_func, lower, middle, limit=200)[0] + quad(overlap_func, middle, upper, limit=200)[0])
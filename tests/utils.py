@@ -4,7 +4,8 @@ import numpy as np
 import pyopencl as cl
 
 from mot.lib.utils import device_type_from_string, device_supports_double, is_scalar, \
-    all_elements_equal, get_single_value, topological_sort
+    all_elements_equal, get_single_value, topological_sort, ctype_to_dtype, convert_inputs_to_kernel_data
+from mot.lib.cl_function import SimpleCLFunctionParameter
 
 __author__ = 'Robbert Harms'
 __date__ = "2017-03-28"
@@ -39,6 +40,26 @@ class test_device_supports_double(unittest.TestCase):
                 assert(device_supports_double(device) == has_double)
 
 
+class test_ctype_to_dtype(unittest.TestCase):
+
+    def test_half(self):
+        assert(ctype_to_dtype('half') == np.float16)
+
+    def test_mot_float_type(self):
+        assert(ctype_to_dtype('mot_float_type', 'half') == np.float16)
+        assert(ctype_to_dtype('mot_float_type', 'double') == np.float64)
+
+
+class test_convert_inputs_to_kernel_data(unittest.TestCase):
+
+    def test_array_modes(self):
+        parameters = [SimpleCLFunctionParameter(declaration) for declaration in [
+            'global float* a', 'global const float* b', 'constant float* c', 'float* const d', '__constant float* e']]
+        kernel_data = convert_inputs_to_kernel_data([np.zeros(3), np.zeros(3), 1, np.zeros(3), np.zeros(3)],
+                                                    parameters, 3)
+        assert([kernel_data[name].mode for name in 'abcde'] == ['rw', 'r', 'r', 'rw', 'r'])
+
+
 class test_is_scalar(unittest.TestCase):
 
     def test_is_not_scalar(self):